@@ -1,14 +1,30 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Notification, Message
+from .models import CustomUser, Notification, Message, Broadcast, Conversation, OutboxEvent, PendingUpload
 
 class CustomUserAdmin(UserAdmin):
     model = CustomUser
     list_display = ('username', 'email', 'role', 'is_staff', 'is_superuser')
     fieldsets = UserAdmin.fieldsets + (
-        ('Role Info', {'fields': ('role',)}),
+        ('Role Info', {'fields': ('role', 'digest_notifications')}),
     )
 
 admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(Notification)
 admin.site.register(Message)
+admin.site.register(Broadcast)
+admin.site.register(Conversation)
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('title', 'kind', 'created_at', 'delivered_at', 'attempts')
+    list_filter = ('kind',)
+    readonly_fields = ('created_at',)
+
+
+@admin.register(PendingUpload)
+class PendingUploadAdmin(admin.ModelAdmin):
+    list_display = ('staged_name', 'destination', 'status', 'attempts', 'next_attempt_at')
+    list_filter = ('status',)
+    readonly_fields = ('created_at',)
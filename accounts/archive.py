@@ -0,0 +1,43 @@
+# accounts/archive.py
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedNotification, Notification
+
+ARCHIVED_FIELDS = ['id', 'user_id', 'title', 'message', 'read_at', 'created_at', 'count']
+
+
+def archive_cutoff(days=None):
+    """Notifications created before this moment are old enough to archive."""
+    days = settings.NOTIFICATION_ARCHIVE_AFTER_DAYS if days is None else days
+    return timezone.now() - datetime.timedelta(days=days)
+
+
+def archive_notifications(older_than, batch_size=1000, max_batches=None):
+    """
+    Move read notifications created before `older_than` into ArchivedNotification.
+    Each batch is copied and deleted in its own short transaction, and the
+    scan resumes after the last id seen, so the job can be stopped at any
+    point and re-run. Yields the number of rows moved per batch.
+    """
+    candidates = Notification.objects.filter(read=True, created_at__lt=older_than).order_by('id')
+    last_id = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(candidates.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return
+        last_id = ids[-1]
+
+        with transaction.atomic():
+            # Re-read inside the transaction: a row may have changed since the scan
+            rows = Notification.objects.filter(id__in=ids, read=True).values(*ARCHIVED_FIELDS)
+            archived = ArchivedNotification.objects.bulk_create(
+                [ArchivedNotification(**row) for row in rows], ignore_conflicts=True
+            )
+            Notification.objects.filter(id__in=[row.id for row in archived]).delete()
+        batches += 1
+        yield len(archived)
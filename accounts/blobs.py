@@ -0,0 +1,90 @@
+# accounts/blobs.py
+import hashlib
+import os
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import StoredBlob
+
+BLOB_DIR = 'blobs/'
+CHUNK_SIZE = 64 * 1024
+
+
+def content_digest(content):
+    """
+    SHA-256 of `content`. Uploads carry the digest the upload handler took
+    while the request body streamed in; anything else is read in chunks.
+    """
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    sha256 = hashlib.sha256()
+    for chunk in content.chunks(CHUNK_SIZE):
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def blob_name(digest, original_name):
+    return f"{BLOB_DIR}{digest[:2]}/{digest}{os.path.splitext(original_name)[1].lower()}"
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_DIR)
+
+
+def blob_exists(alias, digest):
+    return StoredBlob.objects.filter(storage=alias, digest=digest).exists()
+
+
+def reuse_blob(alias, digest):
+    """Take a reference to the stored copy of `digest`, if there is one. Returns its name or None."""
+    blob = StoredBlob.objects.filter(storage=alias, digest=digest).only('name').first()
+    if blob and StoredBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1):
+        return blob.name
+    return None
+
+
+def save_blob(storage, alias, name, content):
+    """
+    Store `content` in `storage` (the STORAGES alias `alias`) under its
+    digest and return the stored name, holding one reference. Bytes that
+    are already stored only cost a row UPDATE: nothing is sent to storage.
+    """
+    digest = content_digest(content)
+    existing = reuse_blob(alias, digest)
+    if existing:
+        return existing
+
+    target = blob_name(digest, name)
+    try:
+        with transaction.atomic():
+            blob = StoredBlob.objects.create(storage=alias, digest=digest, name=target, size=content.size)
+    except IntegrityError:
+        # The same bytes were stored concurrently
+        return reuse_blob(alias, digest)
+    try:
+        stored = storage.save(target, content)
+    except Exception:
+        blob.delete()
+        raise
+    if stored != target:
+        # A stray file already had the name, so the storage picked another one
+        StoredBlob.objects.filter(pk=blob.pk).update(name=stored)
+    return stored
+
+
+def release_blob(storage, alias, name):
+    """
+    Drop one reference to the blob stored as `name`, deleting the file along
+    with the last one. Returns whether the file was deleted.
+    """
+    blob = StoredBlob.objects.filter(storage=alias, name=name).first()
+    if blob is None:
+        return False
+    deleted, _ = StoredBlob.objects.filter(pk=blob.pk, ref_count__lte=1).delete()
+    if deleted:
+        storage.delete(name)
+        return True
+    StoredBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+    return False
@@ -0,0 +1,95 @@
+# accounts/coalescing.py
+import datetime
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Notification
+
+DIGEST_KIND = 'digest'
+
+
+def notify(user, title, message, kind='', key='', window=None):
+    """
+    Notify `user` (a user or a user id), folding repeats into one row. An
+    unread notification of the same `kind` about the same `key`
+    (e.g. 'milestone:12') touched within the last `window` seconds (default
+    settings.NOTIFICATION_COALESCE_WINDOW) takes the new title and message,
+    moves back to the top of the inbox and has its `count` bumped instead of
+    a new row being written.
+    Without a `kind` this is a plain Notification.objects.create().
+    """
+    user_id = getattr(user, 'pk', user)
+    if not kind:
+        return Notification.objects.create(user_id=user_id, title=title, message=message)
+
+    window = settings.NOTIFICATION_COALESCE_WINDOW if window is None else window
+    now = timezone.now()
+    with transaction.atomic():
+        note = (
+            Notification.objects.select_for_update()
+            .filter(user=user_id, kind=kind, group_key=key, read=False,
+                    created_at__gte=now - datetime.timedelta(seconds=window))
+            .order_by('-created_at')
+            .first()
+        )
+        if note is None:
+            return Notification.objects.create(
+                user_id=user_id, title=title, message=message, kind=kind, group_key=key
+            )
+        note.title, note.message, note.created_at = title, message, now
+        note.count = F('count') + 1
+        note.save(update_fields=['title', 'message', 'created_at', 'count'])
+        note.refresh_from_db(fields=['count'])
+    return note
+
+
+# -----------------------------
+# Periodic digest
+# -----------------------------
+def _digestible(user_id):
+    return Notification.objects.filter(user_id=user_id, read=False).exclude(kind__in=['', DIGEST_KIND])
+
+
+def build_digest(user_id):
+    """
+    Replace the user's unread coalesced notifications with one digest row
+    listing each title and how often it happened. Plain notifications and
+    earlier digests are left alone. Returns the digest, or None if there was
+    nothing to fold.
+    """
+    with transaction.atomic():
+        rows = list(_digestible(user_id).select_for_update().values('id', 'title', 'count'))
+        if not rows:
+            return None
+        totals = Counter()
+        for row in rows:
+            totals[row['title']] += row['count']
+        lines = [f"{title} ×{count}" if count > 1 else title for title, count in totals.most_common()]
+        total = sum(totals.values())
+        digest = Notification.objects.create(
+            user_id=user_id,
+            title=f"{total} update{'s' if total != 1 else ''} since your last digest",
+            message='; '.join(lines),
+            kind=DIGEST_KIND,
+            count=total,
+        )
+        Notification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+    return digest
+
+
+def send_digests():
+    """build_digest() for every user who opted in and has something to fold; yields the digests."""
+    user_ids = (
+        Notification.objects.filter(user__digest_notifications=True, read=False)
+        .exclude(kind__in=['', DIGEST_KIND])
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+    for user_id in list(user_ids):
+        digest = build_digest(user_id)
+        if digest is not None:
+            yield digest
@@ -0,0 +1,13 @@
+from .notifications import get_notification_summary
+
+
+def notifications(request):
+    """Expose the cached unread count and latest notifications to every template."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    summary = get_notification_summary(user)
+    return {
+        'notifications_count': summary['count'],
+        'notifications': summary['recent'],
+    }
@@ -1,5 +1,9 @@
 from django import forms
 
+from .messaging import can_message
+from .models import CustomUser
+
+
 class LoginForm(forms.Form):
     username = forms.CharField(
         max_length=150,
@@ -8,3 +12,29 @@ class LoginForm(forms.Form):
     password = forms.CharField(
         widget=forms.PasswordInput(attrs={'placeholder': 'Password'})
     )
+
+
+class MessageForm(forms.Form):
+    body = forms.CharField(
+        widget=forms.Textarea(attrs={'rows': 3, 'placeholder': 'Write a message…'})
+    )
+
+
+class NewMessageForm(MessageForm):
+    recipient = forms.CharField(
+        max_length=150,
+        widget=forms.TextInput(attrs={'placeholder': 'Username'})
+    )
+    subject = forms.CharField(max_length=200, required=False)
+
+    field_order = ['recipient', 'subject', 'body']
+
+    def __init__(self, *args, sender=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sender = sender
+
+    def clean_recipient(self):
+        receiver = CustomUser.objects.filter(username=self.cleaned_data['recipient']).first()
+        if receiver is None or not can_message(self.sender, receiver):
+            raise forms.ValidationError("You cannot message this user.")
+        return receiver
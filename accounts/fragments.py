@@ -0,0 +1,46 @@
+# accounts/fragments.py
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _generation_key(widget, user_id):
+    return f"fragment-gen:{widget}:{user_id}"
+
+
+def widget_generation(widget, user_id):
+    """
+    Current generation of `widget` for `user_id`. Templates add it to their
+    {% cache %} vary-on list, so bumping it orphans every cached copy.
+    """
+    key = _generation_key(widget, user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Time-based so a lost key never resurrects an older fragment
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_widgets(widgets, user_ids):
+    """Move `widgets` to a new generation for every user once the current transaction commits."""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+
+    def bump():
+        generation = time.time_ns()
+        cache.set_many({_generation_key(w, u): generation for w in widgets for u in user_ids}, None)
+
+    transaction.on_commit(bump)
+
+
+def role_generation(role):
+    """Generation shared by every user with `role`; broadcasts move it instead of one key per user."""
+    return widget_generation('role', role)
+
+
+def bump_role(role):
+    """Retire cached widgets and notification summaries for every user with `role`."""
+    bump_widgets(['role'], [role])
@@ -0,0 +1,84 @@
+# accounts/landing.py
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from projects.models import Project
+from freelancer.models import FreelancerProfile
+from startup.models import StartupProfile
+from mentors.models import MentorProfile
+
+COUNTS_KEY = "landing:counts"
+REFRESH_LOCK_KEY = "landing:counts:refreshing"
+
+# How long a request waits for another request's cold-cache refresh before showing zeros
+COLD_WAIT = 2.0
+COLD_POLL_INTERVAL = 0.05
+EMPTY_COUNTS = {'projects_count': 0, 'freelancers_count': 0, 'startups_count': 0, 'mentors_count': 0}
+
+
+def compute_landing_counts():
+    """Run the table-wide counts shown on the landing page."""
+    return {
+        'projects_count': Project.objects.count(),
+        'freelancers_count': FreelancerProfile.objects.count(),
+        'startups_count': StartupProfile.objects.count(),
+        'mentors_count': MentorProfile.objects.count(),
+    }
+
+
+def refresh_landing_counts():
+    """Recompute the counts and store them with a fresh timestamp."""
+    counts = compute_landing_counts()
+    # Keep the entry well past its freshness window so stale values can be served during a refresh
+    cache.set(COUNTS_KEY, (time.time(), counts), settings.LANDING_COUNTS_TTL * 10)
+    return counts
+
+
+def _refresh_in_background():
+    def run():
+        close_old_connections()
+        try:
+            refresh_landing_counts()
+        finally:
+            cache.delete(REFRESH_LOCK_KEY)
+            close_old_connections()
+
+    threading.Thread(target=run, name="landing-counts-refresh", daemon=True).start()
+
+
+def _wait_for_counts():
+    deadline = time.monotonic() + COLD_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(COLD_POLL_INTERVAL)
+        entry = cache.get(COUNTS_KEY)
+        if entry is not None:
+            return entry[1]
+    return dict(EMPTY_COUNTS)
+
+
+def get_landing_counts():
+    """
+    Landing page counters, recomputed at most every LANDING_COUNTS_TTL seconds.
+    Stale values are served while a single background thread refreshes them;
+    cache.add() acts as the lock so concurrent requests never stampede the DB.
+    On a cold cache the lock holder computes inline while the others wait up
+    to COLD_WAIT seconds for its result, then fall back to zeros.
+    """
+    entry = cache.get(COUNTS_KEY)
+    if entry is None:
+        if not cache.add(REFRESH_LOCK_KEY, 1, settings.LANDING_COUNTS_TTL):
+            return _wait_for_counts()
+        try:
+            return refresh_landing_counts()
+        finally:
+            cache.delete(REFRESH_LOCK_KEY)
+
+    computed_at, counts = entry
+    if time.time() - computed_at >= settings.LANDING_COUNTS_TTL:
+        if cache.add(REFRESH_LOCK_KEY, 1, settings.LANDING_COUNTS_TTL):
+            _refresh_in_background()
+    return counts
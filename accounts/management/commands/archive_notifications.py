@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from accounts.archive import archive_cutoff, archive_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Move read notifications older than --days into the archive table in small batches. "
+        "Safe to run on a schedule and to interrupt."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Archive read notifications older than this. "
+                                 "Defaults to settings.NOTIFICATION_ARCHIVE_AFTER_DAYS.")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Rows moved per transaction.")
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help="Stop after this many batches; the next run carries on.")
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['days'])
+        moved = 0
+        for count in archive_notifications(cutoff, options['batch_size'], options['max_batches']):
+            moved += count
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} notification(s) created before {cutoff:%Y-%m-%d}."))
@@ -0,0 +1,123 @@
+import datetime
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import Notification
+
+# Indexes added for the hot inbox queries; "before" is the schema without them
+NEW_INDEXES = ('accounts_notif_user_read_idx', 'accounts_notif_unread_idx')
+HEAVY_USER = 1
+ALIAS = 'notification_benchmark'
+
+
+def _hot_queries(using):
+    """The inbox and badge queries, as the ORM runs them for one heavy user."""
+    notes = Notification.objects.using(using).filter(user_id=HEAVY_USER)
+    return {
+        'unread count': lambda: notes.filter(read=False).count(),
+        'unread page': lambda: list(notes.filter(read=False).order_by('-created_at', '-pk')[:25]),
+        'read page': lambda: list(notes.filter(read=True).order_by('-created_at', '-pk')[:25]),
+        'recent': lambda: list(notes.order_by('-created_at', '-pk')[:5]),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Build a synthetic notification table in a scratch SQLite file and report "
+        "query plans and latencies of the inbox queries before and after the hot-query indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=5_000)
+        parser.add_argument('--heavy-rows', type=int, default=40_000,
+                            help="Rows owned by the benchmarked user.")
+        parser.add_argument('--unread-ratio', type=float, default=0.1)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError("The benchmark copies the default SQLite settings for its scratch database.")
+
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        connections.databases[ALIAS] = {**connections.databases['default'], 'NAME': path}
+        try:
+            scratch = connections[ALIAS]
+            indexes = [index for index in Notification._meta.indexes if index.name in NEW_INDEXES]
+            with scratch.schema_editor() as editor:
+                editor.create_model(Notification)
+            # Raw index DDL, as the editor would re-check the user foreign keys on exit
+            editor = scratch.schema_editor()
+            for index in indexes:
+                scratch.cursor().execute(f"DROP INDEX {scratch.ops.quote_name(index.name)}")
+            self._fill(scratch, options)
+
+            before = self._measure(scratch, options['repeat'])
+            started = time.perf_counter()
+            for index in indexes:
+                scratch.cursor().execute(str(index.create_sql(Notification, editor)))
+            scratch.cursor().execute("ANALYZE")
+            build = time.perf_counter() - started
+            after = self._measure(scratch, options['repeat'])
+        finally:
+            connections[ALIAS].close()
+            del connections[ALIAS]
+            del connections.databases[ALIAS]
+            os.remove(path)
+
+        self.stdout.write(f"{options['rows']:,} rows, {options['users']:,} users, "
+                          f"user {HEAVY_USER} owns {options['heavy_rows']:,}; new indexes built in {build:.1f}s\n")
+        for label in before:
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f"  before {before[label][0]:8.3f} ms  {before[label][1]}")
+            self.stdout.write(f"  after  {after[label][0]:8.3f} ms  {after[label][1]}")
+
+    def _fill(self, scratch, options):
+        rng = random.Random(options['seed'])
+        start = datetime.datetime(2024, 1, 1)
+        span = 2 * 365 * 24 * 3600
+
+        def rows():
+            for n in range(options['rows']):
+                user_id = HEAVY_USER if n < options['heavy_rows'] else rng.randint(2, options['users'])
+                created = start + datetime.timedelta(seconds=rng.randrange(span))
+                read = rng.random() >= options['unread_ratio']
+                read_at = (created + datetime.timedelta(hours=1)).isoformat(' ') if read else None
+                yield user_id, 'Title', 'Message body', '', '', 1, read, read_at, created.isoformat(' ', 'microseconds')
+
+        scratch.ensure_connection()
+        db = scratch.connection
+        # There is no user table in the scratch file
+        db.execute("PRAGMA foreign_keys = OFF")
+        with transaction.atomic(using=ALIAS):
+            db.executemany(
+                'INSERT INTO "accounts_notification" '
+                '("user_id", "title", "message", "kind", "group_key", "count", "read", "read_at", "created_at") '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows(),
+            )
+        db.execute("ANALYZE")
+
+    def _measure(self, scratch, repeat):
+        results = {}
+        for label, run in _hot_queries(ALIAS).items():
+            with CaptureQueriesContext(scratch) as queries:
+                run()
+            plan_rows = scratch.cursor().execute(f"EXPLAIN QUERY PLAN {queries.captured_queries[-1]['sql']}")
+            plan = ' / '.join(row[-1] for row in plan_rows)
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[label] = (statistics.median(timings), plan)
+        return results
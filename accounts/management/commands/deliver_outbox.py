@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import OUTBOX_BATCH_SIZE, drain_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver pending outbox events in batches. Run it from cron, or with --poll "
+        "as a long-lived worker; several workers may run at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE,
+                            help="Events delivered per transaction.")
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help="Stop after this many batches; the next run carries on.")
+        parser.add_argument('--poll', type=float, default=None,
+                            help="Keep running, checking for new events every this many seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            handled = sum(drain_outbox(options['batch_size'], options['max_batches']))
+            if options['poll'] is None:
+                break
+            if handled:
+                self.stdout.write(f"Handled {handled} event(s).")
+            time.sleep(options['poll'])
+        self.stdout.write(self.style.SUCCESS(f"Handled {handled} event(s)."))
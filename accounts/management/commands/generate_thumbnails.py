@@ -0,0 +1,39 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.thumbnails import can_have_derivatives, clear_failure, ensure_derivatives, generate_derivatives
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the resized WebP and JPEG/PNG copies of every image in settings.THUMBNAIL_FIELDS "
+        "that does not have them yet, e.g. after changing THUMBNAIL_WIDTHS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help="Rebuild derivatives that are already on disk.")
+
+    def handle(self, *args, **options):
+        built = 0
+        for key in settings.THUMBNAIL_FIELDS:
+            model_label, field_name = key.rsplit('.', 1)
+            model = apps.get_model(model_label)
+            rows = model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for instance in rows.only('pk', field_name).iterator():
+                field_file = getattr(instance, field_name)
+                if not can_have_derivatives(field_file.name):
+                    continue
+                # Retry images whose last attempt failed, e.g. once their storage is back
+                clear_failure(field_file.name)
+                if options['force']:
+                    try:
+                        generate_derivatives(field_file)
+                    except Exception as exc:
+                        self.stderr.write(f"{key} #{instance.pk}: {exc}")
+                        continue
+                elif ensure_derivatives(field_file) is None:
+                    continue
+                built += 1
+        self.stdout.write(self.style.SUCCESS(f"{built} image(s) have derivatives."))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.uploads import process_due_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Upload staged files that are due: retries after failures and uploads whose "
+        "worker died. Run it from cron, or with --poll as a long-lived worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None,
+                            help="Stop after this many uploads; the next run carries on.")
+        parser.add_argument('--poll', type=float, default=None,
+                            help="Keep running, checking for due uploads every this many seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            results = process_due_uploads(options['limit'])
+            if options['poll'] is None:
+                break
+            if results:
+                self.stdout.write(self._summary(results))
+            time.sleep(options['poll'])
+        self.stdout.write(self.style.SUCCESS(self._summary(results)))
+
+    def _summary(self, results):
+        if not results:
+            return "No uploads due."
+        return ", ".join(f"{count} {status.lower()}" for status, count in sorted(results.items()))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.coalescing import send_digests
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold the unread routine notifications of users with digest_notifications "
+        "into one digest notification each. Meant to run on a schedule (e.g. daily)."
+    )
+
+    def handle(self, *args, **options):
+        sent = sum(1 for _ in send_digests())
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} digest(s)."))
@@ -0,0 +1,149 @@
+# accounts/messaging.py
+from django.db import transaction
+from django.db.models import Case, Count, F, PositiveIntegerField, When
+from django.utils import timezone
+
+from .models import Conversation, ConversationMember, Message
+from .pagination import keyset_page
+
+MESSAGING_ROLES = ('STARTUP', 'FREELANCER', 'MENTOR')
+THREAD_PAGE_SIZE = 25
+MESSAGE_PAGE_SIZE = 30
+PREVIEW_LENGTH = 200
+
+
+def conversation_key(user_id, other_user_id):
+    low, high = sorted((user_id, other_user_id))
+    return f"{low}:{high}"
+
+
+def get_or_create_conversation(user_id, other_user_id):
+    """The thread between two users, created with both member rows on first use."""
+    with transaction.atomic():
+        conversation, created = Conversation.objects.get_or_create(key=conversation_key(user_id, other_user_id))
+        if created:
+            ConversationMember.objects.bulk_create([
+                ConversationMember(conversation=conversation, user_id=user_id, other_user_id=other_user_id),
+                ConversationMember(conversation=conversation, user_id=other_user_id, other_user_id=user_id),
+            ])
+    return conversation
+
+
+def can_message(sender, receiver):
+    return (
+        sender.pk != receiver.pk
+        and receiver.is_active
+        and sender.role in MESSAGING_ROLES
+        and receiver.role in MESSAGING_ROLES
+    )
+
+
+def send_message(sender, receiver, body, subject=''):
+    """Send `body` from `sender` to `receiver`; the thread bookkeeping happens in the Message signals."""
+    return Message.objects.create(sender=sender, receiver=receiver, body=body, subject=subject)
+
+
+# -----------------------------
+# Denormalized thread state
+# -----------------------------
+def record_message(message):
+    """
+    Fold a new message into its thread: copy it onto the Conversation row and
+    bump the receiver's unread counter, two UPDATEs whatever the thread size.
+    """
+    Conversation.objects.filter(pk=message.conversation_id).update(
+        last_message=message,
+        last_message_at=message.sent_at,
+        last_message_preview=message.body[:PREVIEW_LENGTH],
+        last_sender=message.sender_id,
+    )
+    ConversationMember.objects.filter(conversation=message.conversation_id).update(
+        last_message_at=message.sent_at,
+        unread_count=Case(
+            When(user=message.receiver_id, then=F('unread_count') + 1),
+            default=F('unread_count'),
+            output_field=PositiveIntegerField(),
+        ),
+    )
+
+
+def rebuild_conversation(conversation_id):
+    """Recompute a thread's last message and unread counters from its messages, e.g. after a delete."""
+    messages = Message.objects.filter(conversation=conversation_id)
+    last = messages.order_by('-sent_at', '-id').first()
+    Conversation.objects.filter(pk=conversation_id).update(
+        last_message=last,
+        last_message_at=last.sent_at if last else None,
+        last_message_preview=last.body[:PREVIEW_LENGTH] if last else '',
+        last_sender=last.sender_id if last else None,
+    )
+    unread = dict(
+        messages.filter(read=False).values_list('receiver').annotate(count=Count('id')).order_by()
+    )
+    members = ConversationMember.objects.filter(conversation=conversation_id)
+    for user_id in members.values_list('user_id', flat=True):
+        members.filter(user=user_id).update(
+            last_message_at=last.sent_at if last else None,
+            unread_count=unread.get(user_id, 0),
+        )
+
+
+def mark_conversation_read(user, conversation_id):
+    """Mark every message `user` received in the thread as read. Returns how many were unread."""
+    with transaction.atomic():
+        # Locking the member row holds off record_message() until both updates are in
+        member = ConversationMember.objects.select_for_update().filter(
+            conversation=conversation_id, user=user
+        ).first()
+        if member is None or not member.unread_count:
+            return 0
+        Message.objects.filter(conversation=conversation_id, receiver=user, read=False).update(read=True)
+        ConversationMember.objects.filter(pk=member.pk).update(unread_count=0, last_read_at=timezone.now())
+    return member.unread_count
+
+
+# -----------------------------
+# Reading
+# -----------------------------
+def thread_page(user, cursor=None, per_page=None):
+    """
+    One page of `user`'s threads, most recently active first, as
+    (members, next_cursor). Each ConversationMember comes with its other user
+    and the denormalized last message, all in a single query.
+    """
+    members = (
+        ConversationMember.objects.filter(user=user, last_message_at__isnull=False)
+        .select_related('other_user', 'conversation')
+    )
+    return keyset_page(members, 'last_message_at', cursor, per_page or THREAD_PAGE_SIZE)
+
+
+def message_page(conversation_id, cursor=None, per_page=None):
+    """One page of a thread's history, newest first, as (messages, next_cursor)."""
+    messages = Message.objects.filter(conversation=conversation_id)
+    return keyset_page(messages, 'sent_at', cursor, per_page or MESSAGE_PAGE_SIZE)
+
+
+def thread_item(member):
+    """JSON shape of one thread list entry."""
+    conversation = member.conversation
+    return {
+        'id': conversation.pk,
+        'with': member.other_user.get_full_name() or member.other_user.username,
+        'unread': member.unread_count,
+        'preview': conversation.last_message_preview,
+        'last_sender': conversation.last_sender_id,
+        'last_message_at': conversation.last_message_at,
+    }
+
+
+def message_item(message):
+    """JSON shape of one message."""
+    return {
+        'id': message.pk,
+        'sender': message.sender_id,
+        'subject': message.subject,
+        'body': message.body,
+        'read': message.read,
+        'sent_at': message.sent_at,
+    }
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Broadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('ADMIN', 'Admin'), ('STARTUP', 'Startup'), ('FREELANCER', 'Freelancer'), ('MENTOR', 'Mentor'), ('INVESTOR', 'Investor')], max_length=20)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['role', 'created_at'], name='accounts_broadcast_role_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_id', models.PositiveBigIntegerField(default=0)),
+                ('read_ids', models.JSONField(blank=True, default=list)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_cursor', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_broadcast'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='accounts_notif_inbox_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_notification_inbox_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivednotification',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='digest_notifications',
+            field=models.BooleanField(default=False, help_text='Fold routine notifications into a periodic digest (see send_notification_digests).'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='group_key',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'kind', 'group_key', 'created_at'], name='accounts_notif_group_idx'),
+        ),
+    ]
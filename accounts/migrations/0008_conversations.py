@@ -0,0 +1,103 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_conversations(apps, schema_editor):
+    # Group existing messages into one thread per pair of users and fill the denormalized columns
+    Message = apps.get_model('accounts', 'Message')
+    Conversation = apps.get_model('accounts', 'Conversation')
+    ConversationMember = apps.get_model('accounts', 'ConversationMember')
+    threads = {}
+    for message in Message.objects.order_by('sent_at', 'id').iterator():
+        low, high = sorted((message.sender_id, message.receiver_id))
+        if (low, high) not in threads:
+            conversation = Conversation.objects.create(key=f"{low}:{high}")
+            threads[(low, high)] = (conversation, {
+                low: ConversationMember(conversation=conversation, user_id=low, other_user_id=high),
+                high: ConversationMember(conversation=conversation, user_id=high, other_user_id=low),
+            })
+        conversation, members = threads[(low, high)]
+        Message.objects.filter(pk=message.pk).update(conversation=conversation)
+        conversation.last_message = message
+        conversation.last_message_at = message.sent_at
+        conversation.last_message_preview = message.body[:200]
+        conversation.last_sender_id = message.sender_id
+        for member in members.values():
+            member.last_message_at = message.sent_at
+        if not message.read:
+            members[message.receiver_id].unread_count += 1
+    for conversation, members in threads.values():
+        conversation.save()
+        ConversationMember.objects.bulk_create(members.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_notification_coalescing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('last_read_at', models.DateTimeField(blank=True, null=True)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='message',
+            name='subject',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_message_at', models.DateTimeField(blank=True, null=True)),
+                ('last_message_preview', models.CharField(blank=True, max_length=200)),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.message')),
+                ('last_sender', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='conversation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='accounts.conversation'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'sent_at', 'id'], name='accounts_msg_thread_idx'),
+        ),
+        migrations.AddField(
+            model_name='conversationmember',
+            name='conversation',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='accounts.conversation'),
+        ),
+        migrations.AddField(
+            model_name='conversationmember',
+            name='other_user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversationmember',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_memberships', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='conversationmember',
+            index=models.Index(fields=['user', 'last_message_at', 'id'], name='accounts_member_threads_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversationmember',
+            constraint=models.UniqueConstraint(fields=('conversation', 'user'), name='accounts_member_unique'),
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
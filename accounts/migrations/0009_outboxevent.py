@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_conversations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_ids', models.JSONField(default=list)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('kind', models.CharField(blank=True, max_length=50)),
+                ('group_key', models.CharField(blank=True, max_length=100)),
+                ('channels', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('delivered_at__isnull', True)), fields=['id'], name='accounts_outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_pending_uploads'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='pendingupload',
+            name='mime_type',
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_remove_pendingupload_mime_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('storage', models.CharField(max_length=50)),
+                ('digest', models.CharField(max_length=64)),
+                ('name', models.CharField(max_length=255)),
+                ('size', models.PositiveBigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['storage', 'name'], name='accounts_blob_name_idx')],
+                'constraints': [models.UniqueConstraint(fields=('storage', 'digest'), name='accounts_blob_digest_uniq')],
+            },
+        ),
+    ]
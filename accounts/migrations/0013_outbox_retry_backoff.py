@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_stored_blobs'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outboxevent',
+            name='accounts_outbox_pending_idx',
+        ),
+        migrations.AddField(
+            model_name='outboxevent',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(condition=models.Q(('delivered_at__isnull', True)), fields=['next_attempt_at', 'id'], name='accounts_outbox_due_idx'),
+        ),
+    ]
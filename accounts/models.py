@@ -1,5 +1,8 @@
 from django.contrib.auth.models import AbstractUser, Group, Permission
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
 class CustomUser(AbstractUser):
     ROLE_CHOICES = [
@@ -11,6 +14,10 @@ class CustomUser(AbstractUser):
     ]
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='STARTUP')
     created_at = models.DateTimeField(auto_now_add=True)
+    digest_notifications = models.BooleanField(
+        default=False,
+        help_text='Fold routine notifications into a periodic digest (see send_notification_digests).'
+    )
 
     # override to avoid clashes
     groups = models.ManyToManyField(
@@ -42,24 +49,256 @@ class Notification(models.Model):
     title = models.CharField(max_length=200)
     message = models.TextField()
     read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    
+    # Set by accounts.coalescing.notify(): repeats of `kind` about `group_key` bump `count` on one row
+    kind = models.CharField(max_length=50, blank=True)
+    group_key = models.CharField(max_length=100, blank=True)
+    count = models.PositiveIntegerField(default=1)
+
+    is_broadcast = False
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's inbox by (created_at, id)
+            models.Index(fields=['user', 'created_at', 'id'], name='accounts_notif_inbox_idx'),
+            # Finding the open row to coalesce into
+            models.Index(fields=['user', 'kind', 'group_key', 'created_at'], name='accounts_notif_group_idx'),
+            # Read/unread inbox filters
+            models.Index(fields=['user', 'read', 'created_at'], name='accounts_notif_user_read_idx'),
+            # Unread badge counts and lists touch only this small slice (partial where supported)
+            models.Index(fields=['user', 'created_at'], condition=Q(read=False), name='accounts_notif_unread_idx'),
+        ]
+
     def mark_as_read(self):
         if not self.read:
             self.read = True
-            self.save()
+            self.read_at = timezone.now()
+            self.save(update_fields=['read', 'read_at'])
 
     def __str__(self):
         return f"{self.user.username} - {self.title}"
 
+class ArchivedNotification(models.Model):
+    """
+    Read notifications moved out of the hot table by archive_notifications.
+    Rows keep their original id; they are shown under the inbox's "archived" filter.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="archived_notifications")
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    read_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    count = models.PositiveIntegerField(default=1)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    read = True
+    is_broadcast = False
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='accounts_archive_inbox_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.title} (archived)"
+
+
+class Broadcast(models.Model):
+    """
+    A notification stored once for every user with `role`. Users only see
+    broadcasts sent after they joined; read state lives on BroadcastCursor.
+    """
+    role = models.CharField(max_length=20, choices=CustomUser.ROLE_CHOICES)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    is_broadcast = True
+    count = 1
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['role', 'created_at'], name='accounts_broadcast_role_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_role_display()} - {self.title}"
+
+
+class BroadcastCursor(models.Model):
+    """
+    Per-user broadcast read state: every broadcast with id <= last_read_id is
+    read, plus the few ids above it listed in read_ids.
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name="broadcast_cursor")
+    last_read_id = models.PositiveBigIntegerField(default=0)
+    read_ids = models.JSONField(default=list, blank=True)
+
+    def is_read(self, broadcast_id):
+        return broadcast_id <= self.last_read_id or broadcast_id in self.read_ids
+
+    def __str__(self):
+        return f"{self.user.username} read through #{self.last_read_id}"
+
+
+class OutboxEvent(models.Model):
+    """
+    A notification waiting to be delivered. accounts.outbox.publish_event()
+    writes it in the caller's transaction; deliver_outbox turns it into
+    in-app rows (and whatever other `channels` are configured) later.
+    """
+    user_ids = models.JSONField(default=list)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    # Passed through to accounts.coalescing.notify()
+    kind = models.CharField(max_length=50, blank=True)
+    group_key = models.CharField(max_length=100, blank=True)
+    channels = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    # Failed deliveries wait here with exponential backoff before the next try
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'], condition=Q(delivered_at__isnull=True),
+                name='accounts_outbox_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        state = 'delivered' if self.delivered_at else 'pending'
+        return f"{self.title} -> {len(self.user_ids)} user(s) ({state})"
+
+
+class PendingUpload(models.Model):
+    """
+    A file staged on local disk that still has to reach its field's storage.
+    The model field keeps pointing at the local copy (`staged_name`) until
+    accounts.uploads swaps in the stored name.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('UPLOADING', 'Uploading'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    field_name = models.CharField(max_length=100)
+    staged_name = models.CharField(max_length=255)
+    destination = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    url = models.CharField(max_length=500, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='accounts_upload_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.staged_name} -> {self.destination} ({self.status})"
+
+
+class StoredBlob(models.Model):
+    """
+    One file in an upload storage, kept under its SHA-256 digest and shared
+    by every field value with the same bytes. `ref_count` is the number of
+    those values; the file is deleted with the last one (accounts.blobs).
+    """
+    storage = models.CharField(max_length=50)
+    digest = models.CharField(max_length=64)
+    name = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['storage', 'digest'], name='accounts_blob_digest_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['storage', 'name'], name='accounts_blob_name_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} reference(s))"
+
+
+class Conversation(models.Model):
+    """
+    A two-person message thread, one per pair of users. The newest message is
+    copied onto the row so the thread list never has to read Message.
+    """
+    # "<lower user id>:<higher user id>"
+    key = models.CharField(max_length=50, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_message = models.ForeignKey(
+        'Message', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    last_message_at = models.DateTimeField(blank=True, null=True)
+    last_message_preview = models.CharField(max_length=200, blank=True)
+    last_sender = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+
+    def __str__(self):
+        return f"Conversation {self.key}"
+
+
+class ConversationMember(models.Model):
+    """One user's side of a Conversation: who they are talking to and how much is unread."""
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='members')
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='conversation_memberships')
+    other_user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+')
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_at = models.DateTimeField(blank=True, null=True)
+    # Copy of conversation.last_message_at, so a page of the thread list is one index range scan
+    last_message_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['conversation', 'user'], name='accounts_member_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'last_message_at', 'id'], name='accounts_member_threads_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} in {self.conversation.key}"
+
+
 class Message(models.Model):
     sender = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="sent_messages")
     receiver = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="received_messages")
-    subject = models.CharField(max_length=200)
+    # Filled in from (sender, receiver) on save when left empty
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, null=True, blank=True, related_name='messages'
+    )
+    subject = models.CharField(max_length=200, blank=True)
     body = models.TextField()
     read = models.BooleanField(default=False)
     sent_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a thread's history by (sent_at, id)
+            models.Index(fields=['conversation', 'sent_at', 'id'], name='accounts_msg_thread_idx'),
+            models.Index(fields=['receiver', 'sent_at'], name='accounts_msg_inbox_idx'),
+            models.Index(fields=['sender', 'sent_at'], name='accounts_msg_sent_idx'),
+            models.Index(fields=['receiver', 'sent_at'], condition=Q(read=False), name='accounts_msg_unread_idx'),
+        ]
+
     def __str__(self):
         return f"{self.sender.username} -> {self.receiver.username}: {self.subject}"
 
@@ -0,0 +1,211 @@
+# accounts/notifications.py
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .fragments import bump_widgets, role_generation
+from .models import ArchivedNotification, Broadcast, BroadcastCursor, Notification
+from .pagination import keyset_page, merged_keyset_page
+
+RECENT_LIMIT = 5
+INBOX_PAGE_SIZE = 25
+INBOX_FILTERS = ('all', 'unread', 'read', 'archived')
+
+# Sent with `user_id` and `count` after mark_notifications_read() flips rows without post_save
+notifications_marked_read = Signal()
+
+
+def _cache_key(user_id):
+    return f"notifications:summary:{user_id}"
+
+
+# -----------------------------
+# Broadcasts
+# -----------------------------
+def visible_broadcasts(user):
+    """Broadcasts addressed to `user`'s role since they joined, newest first."""
+    return Broadcast.objects.filter(
+        role=user.role, created_at__gte=user.date_joined
+    ).order_by('-created_at', '-id')
+
+
+def get_broadcast_cursor(user):
+    """The user's read cursor; an unsaved empty one if they have never read a broadcast."""
+    return BroadcastCursor.objects.filter(user=user).first() or BroadcastCursor(user=user)
+
+
+def unread_broadcasts(user, cursor):
+    return visible_broadcasts(user).filter(id__gt=cursor.last_read_id).exclude(id__in=cursor.read_ids)
+
+
+def mark_broadcasts_read(user, broadcast_ids=None):
+    """
+    Record broadcasts as read by `user`: the given ids, or every visible one
+    when `broadcast_ids` is None. Returns how many were newly marked.
+    """
+    with transaction.atomic():
+        cursor, _ = BroadcastCursor.objects.select_for_update().get_or_create(user=user)
+        unread = unread_broadcasts(user, cursor)
+        if broadcast_ids is not None:
+            unread = unread.filter(id__in=broadcast_ids)
+        newly_read = set(unread.values_list('id', flat=True))
+        if not newly_read:
+            return 0
+        read = set(cursor.read_ids) | newly_read
+        # Slide the cursor over the unbroken run of read broadcasts so read_ids stays short
+        newer = visible_broadcasts(user).filter(id__gt=cursor.last_read_id).order_by('id')
+        for broadcast_id in newer.values_list('id', flat=True):
+            if broadcast_id not in read:
+                break
+            cursor.last_read_id = broadcast_id
+        cursor.read_ids = sorted(i for i in read if i > cursor.last_read_id)
+        cursor.save()
+    return len(newly_read)
+
+
+def mark_broadcast_read(user, broadcast):
+    """Record `broadcast` as read by `user`. Returns False if it already was."""
+    return mark_broadcasts_read(user, [broadcast.pk]) > 0
+
+
+# -----------------------------
+# Merged notification feed
+# -----------------------------
+def user_notifications(user, unread_only=False, limit=None, cursor=None):
+    """
+    The user's own notifications with their broadcasts merged in, newest first.
+    Broadcasts get a `read` attribute from the cursor, so templates can treat
+    both kinds alike; `is_broadcast` tells them apart.
+    """
+    cursor = cursor or get_broadcast_cursor(user)
+    notifications = user.notifications.order_by('-created_at')
+    broadcasts = visible_broadcasts(user)
+    if unread_only:
+        notifications = notifications.filter(read=False)
+        broadcasts = unread_broadcasts(user, cursor)
+    if limit is not None:
+        notifications, broadcasts = notifications[:limit], broadcasts[:limit]
+
+    broadcasts = list(broadcasts)
+    for broadcast in broadcasts:
+        broadcast.read = cursor.is_read(broadcast.pk)
+    merged = sorted(chain(notifications, broadcasts), key=lambda note: note.created_at, reverse=True)
+    return merged[:limit] if limit is not None else merged
+
+
+def notification_page(user, cursor=None, state='all', per_page=None):
+    """
+    One page of the user's inbox, notifications and broadcasts merged newest
+    first by (created_at, id). `state` is one of INBOX_FILTERS. Returns
+    (items, next_cursor); the cost of a page does not depend on its depth.
+    The 'archived' filter pages ArchivedNotification instead.
+    """
+    per_page = per_page or INBOX_PAGE_SIZE
+    if state == 'archived':
+        return keyset_page(ArchivedNotification.objects.filter(user=user), 'created_at', cursor, per_page)
+
+    read_cursor = get_broadcast_cursor(user)
+    notifications = user.notifications.all()
+    broadcasts = visible_broadcasts(user)
+    broadcasts_read = Q(id__lte=read_cursor.last_read_id) | Q(id__in=read_cursor.read_ids)
+    if state == 'unread':
+        notifications = notifications.filter(read=False)
+        broadcasts = broadcasts.exclude(broadcasts_read)
+    elif state == 'read':
+        notifications = notifications.filter(read=True)
+        broadcasts = broadcasts.filter(broadcasts_read)
+
+    items, next_cursor = merged_keyset_page(
+        [('n', notifications), ('b', broadcasts)], 'created_at',
+        cursor=cursor, per_page=per_page,
+    )
+    for item in items:
+        if item.is_broadcast:
+            item.read = read_cursor.is_read(item.pk)
+    return items, next_cursor
+
+
+def inbox_context(request):
+    """Template context for the first (or `?cursor=`) page of the inbox, honouring `?filter=`."""
+    state = request.GET.get('filter')
+    state = state if state in INBOX_FILTERS else 'all'
+    items, next_cursor = notification_page(request.user, request.GET.get('cursor'), state)
+    return {'notifications': items, 'next_cursor': next_cursor, 'inbox_filter': state}
+
+
+def inbox_item(note):
+    """JSON shape of one inbox entry."""
+    return {
+        'id': note.pk,
+        'broadcast': note.is_broadcast,
+        'title': note.title,
+        'message': note.message,
+        'read': note.read,
+        'count': note.count,
+        'created_at': note.created_at,
+    }
+
+
+def mark_notifications_read(user, notification_ids=None, broadcast_ids=None):
+    """
+    Bulk mark-as-read. Notifications are flipped with a single
+    UPDATE ... WHERE user_id = ? AND read = false, limited to
+    `notification_ids` unless it is None; broadcasts go through the read
+    cursor the same way. Returns the user's new unread count.
+    """
+    notifications = Notification.objects.filter(user=user, read=False)
+    if notification_ids is not None:
+        notifications = notifications.filter(id__in=notification_ids)
+    updated = notifications.update(read=True, read_at=timezone.now())
+    if updated:
+        # update() skips post_save, so do what the per-row receivers would have done
+        invalidate_notification_summary(user.pk)
+        bump_widgets(['notifications', 'stats'], [user.pk])
+        notifications_marked_read.send(sender=Notification, user_id=user.pk, count=updated)
+
+    if broadcast_ids is None or broadcast_ids:
+        mark_broadcasts_read(user, broadcast_ids)
+    return unread_count(user)
+
+
+def unread_count(user, cursor=None):
+    """Unread notifications plus unread broadcasts for `user`."""
+    cursor = cursor or get_broadcast_cursor(user)
+    return user.notifications.filter(read=False).count() + unread_broadcasts(user, cursor).count()
+
+
+def get_notification_summary(user):
+    """
+    Unread count plus the latest notifications for `user`, cached per user.
+    Returns {'count': int, 'recent': [...], 'unread': [...]}; broadcasts are included.
+    """
+    key = _cache_key(user.pk)
+    # A new broadcast moves the role generation, which retires every cached summary for that role
+    generation = role_generation(user.role)
+    entry = cache.get(key)
+    if entry is not None and entry[0] == generation:
+        return entry[1]
+
+    cursor = get_broadcast_cursor(user)
+    summary = {
+        'count': unread_count(user, cursor),
+        'recent': user_notifications(user, limit=RECENT_LIMIT, cursor=cursor),
+        'unread': user_notifications(user, unread_only=True, limit=RECENT_LIMIT, cursor=cursor),
+    }
+    cache.set(key, (generation, summary), settings.NOTIFICATION_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_notification_summary(*user_ids):
+    """
+    Drop the cached summary for every given user id once the current
+    transaction commits; dropping it earlier would let a concurrent request
+    cache the pre-commit summary again.
+    """
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
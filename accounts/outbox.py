@@ -0,0 +1,128 @@
+# accounts/outbox.py
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, models, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .coalescing import notify
+from .models import OutboxEvent
+
+OUTBOX_BATCH_SIZE = 100
+DRAIN_LOCK_KEY = "outbox:draining"
+
+
+def _user_ids(recipients):
+    if isinstance(recipients, (int, models.Model)):
+        recipients = [recipients]
+    return list(dict.fromkeys(getattr(r, 'pk', r) for r in recipients if r is not None))
+
+
+def publish_event(recipients, title, message, kind='', key='', channels=None):
+    """
+    Record a notification for `recipients` (a user, an id, or an iterable or
+    queryset of either) in the outbox. This is a single INSERT in the caller's
+    transaction, whatever the number of recipients: the event exists if and
+    only if the caller's writes commit. `kind`/`key` are handed to notify()
+    on delivery so repeats still coalesce. Returns the event, or None when
+    there is nobody to notify.
+    """
+    user_ids = _user_ids(recipients)
+    if not user_ids:
+        return None
+    event = OutboxEvent.objects.create(
+        user_ids=user_ids, title=title, message=message, kind=kind, group_key=key,
+        channels=list(channels or settings.OUTBOX_CHANNELS),
+    )
+    if settings.OUTBOX_DELIVER_ON_COMMIT:
+        transaction.on_commit(drain_in_background)
+    return event
+
+
+# -----------------------------
+# Delivery
+# -----------------------------
+def deliver_in_app(event):
+    """The 'in_app' channel: a (coalesced) Notification row per recipient; live push follows from its post_save."""
+    for user_id in event.user_ids:
+        notify(user_id, event.title, event.message, kind=event.kind, key=event.group_key)
+
+
+def retry_delay(attempts):
+    """Exponential backoff after the `attempts`-th failure, capped at OUTBOX_RETRY_MAX_DELAY seconds."""
+    return min(settings.OUTBOX_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX_DELAY)
+
+
+def deliver_batch(batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Deliver up to `batch_size` due events, oldest first, in one transaction.
+    Each event is claimed with a conditional UPDATE and handed to its channels
+    inside a savepoint, so the in-app rows and the delivered mark commit
+    together: neither a crash nor a second worker can lose or duplicate them.
+    A failing event is rolled back on its own and rescheduled with backoff,
+    up to OUTBOX_MAX_ATTEMPTS attempts. Returns the number of events handled.
+    """
+    now = timezone.now()
+    pending = OutboxEvent.objects.filter(
+        delivered_at__isnull=True, attempts__lt=settings.OUTBOX_MAX_ATTEMPTS, next_attempt_at__lte=now
+    ).order_by('next_attempt_at', 'id')
+    events = list(pending[:batch_size])
+    with transaction.atomic():
+        for event in events:
+            try:
+                with transaction.atomic():
+                    claimed = OutboxEvent.objects.filter(pk=event.pk, delivered_at__isnull=True).update(
+                        delivered_at=timezone.now()
+                    )
+                    if claimed:
+                        for channel in event.channels:
+                            import_string(settings.OUTBOX_CHANNELS[channel])(event)
+            except Exception as exc:
+                OutboxEvent.objects.filter(pk=event.pk).update(
+                    attempts=F('attempts') + 1, last_error=repr(exc),
+                    next_attempt_at=now + timedelta(seconds=retry_delay(event.attempts + 1)),
+                )
+    return len(events)
+
+
+def drain_outbox(batch_size=OUTBOX_BATCH_SIZE, max_batches=None):
+    """
+    Run deliver_batch() until no event is due or `max_batches` ran; yields the
+    events handled per batch. Failed events are pushed back by their backoff,
+    so a drain never spins on the same failing rows.
+    """
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        handled = deliver_batch(batch_size)
+        if not handled:
+            return
+        batches += 1
+        yield handled
+
+
+def _run_in_background(target):
+    threading.Thread(target=target, name="outbox-drain", daemon=True).start()
+
+
+def drain_in_background():
+    """
+    Drain the outbox on a worker thread, unless one is already at it.
+    Anything a drain misses is picked up by the deliver_outbox command.
+    """
+    if not cache.add(DRAIN_LOCK_KEY, 1, 60):
+        return
+
+    def run():
+        close_old_connections()
+        try:
+            for _ in drain_outbox():
+                pass
+        finally:
+            cache.delete(DRAIN_LOCK_KEY)
+            close_old_connections()
+
+    _run_in_background(run)
@@ -0,0 +1,95 @@
+# accounts/pagination.py
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(value, pk, tag=None):
+    """
+    Opaque cursor for the row with ordering `value` and primary key `pk`.
+    `tag` names the source queryset when several are merged into one feed.
+    """
+    raw = f"{value.isoformat()}|{pk}" if tag is None else f"{value.isoformat()}|{tag}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, tagged=False):
+    """
+    Inverse of encode_cursor(); returns (datetime, pk), or (datetime, tag, pk)
+    with tagged=True, or None for a bad cursor.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        parts = raw.split('|')
+        if len(parts) != (3 if tagged else 2):
+            return None
+        value, pk = parse_datetime(parts[0]), int(parts[-1])
+        if not value:
+            return None
+        return (value, parts[1], pk) if tagged else (value, pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, field, cursor=None, per_page=25):
+    """
+    Return (items, next_cursor) for one page of `queryset`, newest first.
+    Rows are ordered by (`field`, pk) descending and the cursor marks the last
+    row already shown, so every page costs the same index range scan however
+    deep the reader scrolls.
+    """
+    queryset = queryset.order_by(f'-{field}', '-pk')
+    position = decode_cursor(cursor)
+    if position:
+        value, pk = position
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+
+    items = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return items, next_cursor
+
+
+def merged_keyset_page(sources, field, cursor=None, per_page=25):
+    """
+    keyset_page() over several querysets merged into one feed, newest first.
+    `sources` is a list of (tag, queryset); rows tied on `field` are ordered
+    by source, then pk, so the cursor (value, tag, pk) is a total order.
+    Every page costs one bounded range scan per source. Each returned row
+    gets its source's tag as `page_tag`.
+    """
+    tags = [tag for tag, _ in sources]
+    position = decode_cursor(cursor, tagged=True)
+    if position and position[1] not in tags:
+        position = None
+
+    rows = []
+    for index, (tag, queryset) in enumerate(sources):
+        queryset = queryset.order_by(f'-{field}', '-pk')
+        if position:
+            value, cursor_tag, pk = position
+            cursor_index = tags.index(cursor_tag)
+            after = Q(**{f'{field}__lt': value})
+            if index > cursor_index:
+                after |= Q(**{field: value})
+            elif index == cursor_index:
+                after |= Q(**{field: value, 'pk__lt': pk})
+            queryset = queryset.filter(after)
+        for row in queryset[:per_page + 1]:
+            row.page_tag = tag
+            rows.append((index, row))
+
+    rows.sort(key=lambda item: (getattr(item[1], field), -item[0], item[1].pk), reverse=True)
+    items = [row for _, row in rows[:per_page]]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk, last.page_tag)
+    return items, next_cursor
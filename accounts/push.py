@@ -0,0 +1,139 @@
+# accounts/push.py
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .notifications import unread_count
+
+# Queued in place of whatever a slow client missed; the stream turns it into a 'resync' event
+RESYNC = object()
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def role_channel(role):
+    return f"role:{role}"
+
+
+class Subscription:
+    """One connected client: a bounded queue owned by its event loop, fed from any thread."""
+
+    def __init__(self, channels, loop, maxsize):
+        self.channels = channels
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The client's loop has shut down; unsubscribe is on its way
+            pass
+
+    def _put(self, event):
+        if self.queue.full():
+            # Backpressure: rather than buffer without bound for a slow reader,
+            # drop what it has not read and have it refetch its state instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = RESYNC
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class LocalBroker:
+    """
+    In-process pub/sub. It only reaches clients connected to this worker,
+    so multi-worker deployments should point PUSH_BROKER at a shared broker
+    with the same publish/subscribe/unsubscribe methods.
+    """
+
+    def __init__(self):
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels, maxsize):
+        subscription = Subscription(channels, asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            for channel in channels:
+                self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.PUSH_BROKER)()
+
+
+def publish_on_commit(channels, event, data):
+    """
+    Push `event` with JSON-serialisable `data` once the current transaction
+    commits. `channels` is a callable returning the channel names; it runs at
+    commit time so recipient lookups are skipped for rolled-back writes.
+    """
+    def send():
+        broker = get_broker()
+        for channel in channels():
+            broker.publish(channel, {'event': event, 'data': data})
+
+    transaction.on_commit(send)
+
+
+def publish_to_users(user_ids, event, data):
+    """publish_on_commit() for the personal channel of each id in `user_ids` (may be a queryset)."""
+    publish_on_commit(lambda: [user_channel(user_id) for user_id in user_ids if user_id], event, data)
+
+
+def format_event(event):
+    payload = json.dumps(event['data'], cls=DjangoJSONEncoder)
+    return f"event: {event['event']}\ndata: {payload}\n\n"
+
+
+async def event_stream(user):
+    """
+    Server-Sent Events for `user`: their own channel plus their role's.
+    Idle connections cost one parked coroutine; a comment line is sent
+    every PUSH_HEARTBEAT_SECONDS so proxies keep the connection open.
+    """
+    broker = get_broker()
+    subscription = broker.subscribe([user_channel(user.pk), role_channel(user.role)], settings.PUSH_QUEUE_SIZE)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await subscription.get(settings.PUSH_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if event is RESYNC:
+                event = {'event': 'resync', 'data': {'unread': await sync_to_async(unread_count)(user)}}
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
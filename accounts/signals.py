@@ -0,0 +1,186 @@
+# accounts/signals.py
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .fragments import bump_role, bump_widgets
+from .messaging import PREVIEW_LENGTH, get_or_create_conversation, rebuild_conversation, record_message
+from .models import Broadcast, BroadcastCursor, Message, Notification
+from .notifications import invalidate_notification_summary
+from .blobs import is_blob
+from .push import publish_on_commit, publish_to_users, role_channel
+from .storage import FieldStorage
+from .thumbnails import can_have_derivatives, ensure_derivatives, has_derivatives, thumbnail_fields
+from .uploads import _run_in_background
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+@receiver(post_save, sender=BroadcastCursor)
+def invalidate_summary(sender, instance, **kwargs):
+    invalidate_notification_summary(instance.user_id)
+    # The freelancer stat cards include the unread count
+    bump_widgets(['notifications', 'stats'], [instance.user_id])
+
+
+@receiver(post_save, sender=Broadcast)
+@receiver(post_delete, sender=Broadcast)
+def invalidate_role_summaries(sender, instance, **kwargs):
+    bump_role(instance.role)
+
+
+# -----------------------------
+# Message threads
+# -----------------------------
+@receiver(pre_save, sender=Message)
+def attach_conversation(sender, instance, raw=False, **kwargs):
+    if instance.conversation_id is None and not raw:
+        instance.conversation = get_or_create_conversation(instance.sender_id, instance.receiver_id)
+
+
+@receiver(post_save, sender=Message)
+def record_thread_message(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_message(instance)
+        publish_to_users([instance.receiver_id], 'message', {
+            'id': instance.pk,
+            'conversation': instance.conversation_id,
+            'sender': instance.sender_id,
+            'preview': instance.body[:PREVIEW_LENGTH],
+            'sent_at': instance.sent_at,
+        })
+
+
+@receiver(post_delete, sender=Message)
+def rebuild_thread(sender, instance, **kwargs):
+    if instance.conversation_id:
+        rebuild_conversation(instance.conversation_id)
+
+
+# -----------------------------
+# Live push
+# -----------------------------
+def _notification_payload(note):
+    return {
+        'id': note.pk,
+        'title': note.title,
+        'message': note.message,
+        'created_at': note.created_at,
+        'broadcast': note.is_broadcast,
+    }
+
+
+@receiver(post_save, sender=Notification)
+def push_notification(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        publish_to_users([instance.user_id], 'notification', _notification_payload(instance))
+
+
+@receiver(post_save, sender=Broadcast)
+def push_broadcast(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        publish_on_commit(lambda: [role_channel(instance.role)], 'notification', _notification_payload(instance))
+
+
+# -----------------------------
+# Image derivatives
+# -----------------------------
+def _build_thumbnails(field_files):
+    for field_file in field_files:
+        ensure_derivatives(field_file)
+
+
+def queue_thumbnails(sender, instance, raw=False, **kwargs):
+    """Build the derivatives of new images on the upload pool; {% responsive_image %} builds any it missed."""
+    if raw:
+        return
+    files = [getattr(instance, field_name) for field_name in thumbnail_fields(sender)]
+    missing = [f for f in files if can_have_derivatives(f.name) and not has_derivatives(f.name)]
+    if missing:
+        transaction.on_commit(lambda: _run_in_background(_build_thumbnails, missing))
+
+
+for key in settings.THUMBNAIL_FIELDS:
+    post_save.connect(queue_thumbnails, sender=apps.get_model(key.rsplit('.', 1)[0]))
+
+
+# -----------------------------
+# Shared upload references
+# -----------------------------
+def _file_name(value):
+    return getattr(value, 'name', value) or None
+
+
+def _stored_files(instance, fields):
+    # Read from __dict__ so deferred fields are not fetched; load_deferred_files() does it on write
+    return {
+        field: _file_name(instance.__dict__[field.attname]) if field.attname in instance.__dict__ else DEFERRED
+        for field in fields
+    }
+
+
+def _release_on_commit(field, name):
+    if is_blob(name):
+        transaction.on_commit(lambda: field.storage.release(name))
+
+
+def remember_files(sender, instance, **kwargs):
+    instance._stored_files = _stored_files(instance, BLOB_FIELDS[sender])
+
+
+def load_deferred_files(sender, instance, raw=False, **kwargs):
+    """Fetch the stored names of file fields left out by only()/defer(), before the row is written or deleted."""
+    missing = [field for field, name in getattr(instance, '_stored_files', {}).items() if name is DEFERRED]
+    if raw or not missing:
+        return
+    stored = sender._base_manager.filter(pk=instance.pk).values(*[field.attname for field in missing]).first() or {}
+    for field in missing:
+        instance._stored_files[field] = stored.get(field.attname) or None
+
+
+def note_new_files(sender, instance, raw=False, **kwargs):
+    # Files about to be saved, each of which takes a reference of its own
+    instance._new_files = {
+        field for field in BLOB_FIELDS[sender]
+        if isinstance(instance.__dict__.get(field.attname), File)
+        and not getattr(instance.__dict__[field.attname], '_committed', False)
+    }
+
+
+def release_replaced_files(sender, instance, raw=False, **kwargs):
+    """
+    Release what a save replaced. Re-saving the same bytes yields the same
+    blob name, and its new reference cancels the one held by the old value.
+    """
+    if raw:
+        return
+    current = _stored_files(instance, BLOB_FIELDS[sender])
+    for field, name in getattr(instance, '_stored_files', {}).items():
+        if current[field] is DEFERRED:
+            # Still deferred, so the save did not write it
+            current[field] = name
+        elif name != current[field] or field in instance._new_files:
+            _release_on_commit(field, name)
+    instance._stored_files = current
+
+
+def release_deleted_files(sender, instance, **kwargs):
+    for field, name in instance._stored_files.items():
+        _release_on_commit(field, name)
+
+
+BLOB_FIELDS = {}
+for model in apps.get_models():
+    fields = [f for f in model._meta.concrete_fields if isinstance(getattr(f, 'storage', None), FieldStorage)]
+    if fields:
+        BLOB_FIELDS[model] = fields
+        post_init.connect(remember_files, sender=model)
+        pre_save.connect(load_deferred_files, sender=model)
+        pre_save.connect(note_new_files, sender=model)
+        pre_delete.connect(load_deferred_files, sender=model)
+        post_save.connect(release_replaced_files, sender=model)
+        post_delete.connect(release_deleted_files, sender=model)
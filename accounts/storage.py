@@ -0,0 +1,136 @@
+# accounts/storage.py
+import mimetypes
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, Storage, storages
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+from .blobs import blob_exists, content_digest, is_blob, release_blob, save_blob
+from .storage_backends import get_storage_backend
+
+# Files waiting for accounts.uploads to move them to their field's storage
+STAGING_DIR = 'staging/'
+
+# Local disk under MEDIA_ROOT, served from MEDIA_URL
+staging_storage = FileSystemStorage()
+
+
+@deconstructible(path='accounts.storage.BackendStorage')
+class BackendStorage(Storage):
+    """
+    Django's storage API over an upload backend (settings.UPLOAD_BACKEND by
+    default, or the dotted path in `backend`). Files are handed over as
+    streams, so a large upload is never read into memory in one piece.
+    """
+
+    def __init__(self, backend=None):
+        self.backend_path = backend
+
+    @property
+    def backend(self):
+        if self.backend_path is None:
+            return get_storage_backend()
+        return import_string(self.backend_path)()
+
+    def _save(self, name, content):
+        content_type = getattr(content, 'content_type', None) or mimetypes.guess_type(name)[0]
+        self.backend.save(name, content, content_type)
+        return name
+
+    def _open(self, name, mode='rb'):
+        return File(self.backend.open(name), name=name)
+
+    def exists(self, name):
+        return self.backend.exists(name)
+
+    def size(self, name):
+        return self.backend.size(name)
+
+    def url(self, name):
+        return self.backend.url(name)
+
+    def delete(self, name):
+        self.backend.delete(name)
+
+
+def _delete_derivatives(name):
+    # accounts.thumbnails builds on this module, so it is imported on use
+    from .thumbnails import delete_derivatives
+    delete_derivatives(name)
+
+
+def _routed(method):
+    def call(self, name, *args, **kwargs):
+        return getattr(self.storage_for(name), method)(name, *args, **kwargs)
+    call.__name__ = method
+    return call
+
+
+@deconstructible(path='accounts.storage.FieldStorage')
+class FieldStorage(Storage):
+    """
+    The storage of one model field, looked up on every call from
+    settings.UPLOAD_FIELD_STORAGES (STORAGES aliases keyed by
+    "app_label.Model.field", falling back to UPLOAD_DEFAULT_STORAGE).
+    Migrations only record the field key, so moving a field to another
+    storage is a settings change. Names under STAGING_DIR are files still
+    on local disk waiting for accounts.uploads, and are served from there.
+    With UPLOAD_DEDUP, files are stored once per content (accounts.blobs).
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    @property
+    def alias(self):
+        return settings.UPLOAD_FIELD_STORAGES.get(self.field, settings.UPLOAD_DEFAULT_STORAGE)
+
+    def storage_for(self, name):
+        if name.startswith(STAGING_DIR):
+            return staging_storage
+        return storages[self.alias]
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if settings.UPLOAD_DEDUP and not name.startswith(STAGING_DIR):
+            return save_blob(storages[self.alias], self.alias, name, content)
+        return super().save(name, content, max_length)
+
+    def is_stored(self, content):
+        """Whether saving `content` would only take a reference to a copy already in storage."""
+        return settings.UPLOAD_DEDUP and blob_exists(self.alias, content_digest(content))
+
+    def release(self, name):
+        """Let go of a saved file that no field value uses: one reference for a shared blob, else the file."""
+        if not is_blob(name):
+            self.delete(name)
+        elif release_blob(storages[self.alias], self.alias, name):
+            _delete_derivatives(name)
+
+    def delete(self, name):
+        # Blobs are shared; the signals release them when no field value points at them any more
+        if not is_blob(name):
+            self.storage_for(name).delete(name)
+            _delete_derivatives(name)
+
+    def url(self, name):
+        # Rows written before this storage existed may hold a full URL
+        if urlsplit(name).scheme:
+            return name
+        return self.storage_for(name).url(name)
+
+    _open = _routed('_open')
+    _save = _routed('_save')
+    exists = _routed('exists')
+    size = _routed('size')
+    path = _routed('path')
+    listdir = _routed('listdir')
+    get_valid_name = _routed('get_valid_name')
+    get_available_name = _routed('get_available_name')
+    get_accessed_time = _routed('get_accessed_time')
+    get_created_time = _routed('get_created_time')
+    get_modified_time = _routed('get_modified_time')
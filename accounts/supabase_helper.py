@@ -1,45 +1,21 @@
 # accounts/supabase_helper.py
 
-import os
 from datetime import datetime
-from supabase import create_client
-from django.conf import settings
 
-def get_supabase_client():
-    """Create and return Supabase client"""
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+from .storage_backends import get_storage_backend, get_supabase_client  # noqa: F401 (re-exported)
+
 
 def upload_to_supabase(file, folder="uploads"):
+    """
+    Store an uploaded file through the configured backend (settings.UPLOAD_BACKEND)
+    and return its public URL, or None if the upload failed.
+    """
+    # Generate unique filename with timestamp
+    filename = f"{folder}/{datetime.now().strftime('%Y%m%d%H%M%S')}_{file.name}"
     try:
-        supabase = get_supabase_client()
-        # Generate unique filename with timestamp
-        filename = f"{folder}/{datetime.now().strftime('%Y%m%d%H%M%S')}_{file.name}"
-
-        # Upload file to Supabase bucket
-        result = supabase.storage.from_(settings.SUPABASE_BUCKET).upload(
-            filename,
-            file.read(),
-            filetype=file.content_type  # ✅ include MIME type
-        )
-
-        # Check for errors
-        if isinstance(result, dict) and result.get('error'):
-            print(f"❌ Supabase Upload Failed: {result['error']}")
-            return None
-
-        # Get public URL
-        public_url_data = supabase.storage.from_(settings.SUPABASE_BUCKET).get_public_url(filename)
-        public_url = public_url_data.get('publicURL')
-        print("Uploaded file URL:", public_url)
-
-
-        if not public_url:
-            print("⚠️ Supabase Upload Warning: No public URL returned")
-            return None
-
-        print("✅ File uploaded successfully:", public_url)
-        return public_url
-
+        backend = get_storage_backend()
+        backend.save(filename, file, getattr(file, 'content_type', None))
+        return backend.url(filename)
     except Exception as e:
-        print("🚨 Supabase Upload Exception:", e)
+        print("🚨 Upload Exception:", e)
         return None
@@ -0,0 +1,15 @@
+from django import template
+
+from accounts.fragments import role_generation, widget_generation as get_widget_generation
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def widget_generation(context, widget):
+    """
+    {% widget_generation 'stats' as gen %} — use `gen` as a {% cache %} vary-on key.
+    It combines the user's own generation with their role's, which broadcasts move.
+    """
+    user = context['request'].user
+    return f"{get_widget_generation(widget, user.pk)}.{role_generation(user.role)}"
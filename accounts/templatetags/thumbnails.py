@@ -0,0 +1,32 @@
+from django import template
+from django.utils.html import format_html
+
+from accounts.thumbnails import ensure_derivatives, thumbnail_storage
+
+register = template.Library()
+
+
+def _srcset(sizes):
+    return ', '.join(f"{thumbnail_storage.url(name)} {width}w" for width, name in sizes)
+
+
+@register.simple_tag
+def responsive_image(field_file, sizes, alt='', css_class=''):
+    """
+    {% responsive_image employee.profile_picture "100px" alt=employee.name css_class="avatar" %}
+    A <picture> offering the WebP derivatives with a JPEG/PNG srcset as the
+    fallback, so the browser fetches the smallest file that covers `sizes`.
+    Files without derivatives are served as a plain <img>.
+    """
+    if not field_file:
+        return ''
+    found = ensure_derivatives(field_file)
+    if found is None:
+        return format_html('<img src="{}" alt="{}" class="{}" loading="lazy">', field_file.url, alt, css_class)
+    (webp, webp_sizes), (_, fallback_sizes) = found.items()
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="lazy"></picture>',
+        _srcset(webp_sizes), sizes,
+        thumbnail_storage.url(fallback_sizes[0][1]), _srcset(fallback_sizes), sizes, alt, css_class,
+    )
@@ -1,3 +1,877 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile, File
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopFutureHandlers
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+from PIL import Image
+
+from .coalescing import DIGEST_KIND, notify
+from .landing import COUNTS_KEY, REFRESH_LOCK_KEY, get_landing_counts
+from .messaging import mark_conversation_read, send_message, thread_item, thread_page
+from .models import (
+    ArchivedNotification, Broadcast, BroadcastCursor, Conversation, ConversationMember, CustomUser, Message,
+    Notification, OutboxEvent, PendingUpload, StoredBlob,
+)
+from .notifications import get_notification_summary, mark_broadcast_read, mark_notifications_read
+from .outbox import publish_event
+from .push import LocalBroker, event_stream, user_channel
+from .storage_backends import SupabaseBackend, get_storage_backend, get_supabase_client
+from .supabase_helper import upload_to_supabase
+from .storage import FieldStorage
+from .thumbnails import derivative_name, generate_derivatives, has_derivatives
+from .upload_handlers import HashingMemoryFileUploadHandler
+from .uploads import process_upload, save_deferred
+
+
+class NotificationSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='fl', password='pass12345', role='FREELANCER')
+        self.note = Notification.objects.create(user=self.user, title='Hi', message='First')
+
+    def test_summary_is_cached(self):
+        get_notification_summary(self.user)
+        with self.assertNumQueries(0):
+            summary = get_notification_summary(self.user)
+        self.assertEqual(summary['count'], 1)
+        self.assertEqual(summary['recent'], [self.note])
+
+    def test_create_and_read_invalidate(self):
+        get_notification_summary(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.user, title='Again', message='Second')
+        self.assertEqual(get_notification_summary(self.user)['count'], 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.note.mark_as_read()
+        self.assertEqual(get_notification_summary(self.user)['count'], 1)
+
+    def test_invalidation_waits_for_commit(self):
+        get_notification_summary(self.user)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Notification.objects.create(user=self.user, title='Again', message='Second')
+            # A concurrent reader before the commit must not re-cache the old summary for good
+            self.assertEqual(get_notification_summary(self.user)['count'], 1)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_notification_summary(self.user)['count'], 2)
+
+    def test_mark_read_view_invalidates(self):
+        self.client.force_login(self.user)
+        get_notification_summary(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('freelancer:mark_notification_read', args=[self.note.pk]), HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+        self.assertEqual(get_notification_summary(self.user)['count'], 0)
+
+
+class LandingPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_response_is_public_and_counts_cached(self):
+        response = self.client.get(reverse('index'))
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+        with self.assertNumQueries(0):
+            self.client.get(reverse('index'))
+
+    def test_stale_counts_refresh_once(self):
+        cache.set(COUNTS_KEY, (time.time() - 3600, {'projects_count': 7}), 600)
+        with mock.patch('accounts.landing._refresh_in_background') as refresh:
+            self.assertEqual(get_landing_counts()['projects_count'], 7)
+            self.assertEqual(get_landing_counts()['projects_count'], 7)
+        refresh.assert_called_once()
+
+    def test_cold_cache_computes_once(self):
+        cache.add(REFRESH_LOCK_KEY, 1)
+        # Another request holds the lock: wait for its result instead of counting again
+        with self.assertNumQueries(0), mock.patch('accounts.landing.COLD_WAIT', 0.1):
+            self.assertEqual(get_landing_counts()['projects_count'], 0)
+        cache.delete(REFRESH_LOCK_KEY)
+        with self.assertNumQueries(4):
+            get_landing_counts()
+        self.assertIsNone(cache.get(REFRESH_LOCK_KEY))
+
+
+class BroadcastTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='inv', password='pass12345', role='INVESTOR')
+
+    def broadcast(self, title='Round'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Broadcast.objects.create(role='INVESTOR', title=title, message='-')
+
+    def test_broadcast_merges_into_summary(self):
+        get_notification_summary(self.user)
+        first = self.broadcast()
+        Notification.objects.create(user=self.user, title='Direct', message='-')
+        summary = get_notification_summary(self.user)
+        self.assertEqual(summary['count'], 2)
+        self.assertEqual([note.title for note in summary['recent']], ['Direct', 'Round'])
+        self.assertTrue(first.is_broadcast)
+
+    def test_other_roles_and_later_users_do_not_see_it(self):
+        self.broadcast()
+        freelancer = CustomUser.objects.create_user(username='fl', password='pass12345', role='FREELANCER')
+        newcomer = CustomUser.objects.create_user(username='inv2', password='pass12345', role='INVESTOR')
+        self.assertEqual(get_notification_summary(freelancer)['count'], 0)
+        self.assertEqual(get_notification_summary(newcomer)['count'], 0)
+
+    def test_cursor_stays_compact(self):
+        first, second, third = self.broadcast('1'), self.broadcast('2'), self.broadcast('3')
+        mark_broadcast_read(self.user, second)
+        cursor = BroadcastCursor.objects.get(user=self.user)
+        self.assertEqual((cursor.last_read_id, cursor.read_ids), (0, [second.pk]))
+
+        mark_broadcast_read(self.user, first)
+        cursor.refresh_from_db()
+        self.assertEqual((cursor.last_read_id, cursor.read_ids), (second.pk, []))
+        self.assertEqual(get_notification_summary(self.user)['count'], 1)
+        self.assertFalse(mark_broadcast_read(self.user, first))
+
+    def test_mark_read_view(self):
+        broadcast = self.broadcast()
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('mark_broadcast_read', args=[broadcast.pk]), HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.json(), {'success': True, 'id': broadcast.pk})
+        self.assertEqual(get_notification_summary(self.user)['count'], 0)
+
+
+class LocalBrokerTests(SimpleTestCase):
+    async def test_publish_from_another_thread(self):
+        broker = LocalBroker()
+        subscription = broker.subscribe([user_channel(1)], maxsize=10)
+        thread = threading.Thread(target=broker.publish, args=(user_channel(1), {'event': 'x', 'data': 1}))
+        thread.start()
+        thread.join()
+        self.assertEqual(await subscription.get(timeout=1), {'event': 'x', 'data': 1})
+        broker.unsubscribe(subscription)
+        self.assertEqual(broker._channels, {})
+
+    async def test_slow_reader_is_told_to_resync(self):
+        broker = LocalBroker()
+        subscription = broker.subscribe([user_channel(1)], maxsize=2)
+        for n in range(3):
+            broker.publish(user_channel(1), {'event': 'x', 'data': n})
+        await asyncio.sleep(0)
+        self.assertEqual(subscription.queue.qsize(), 1)
+
+    @override_settings(PUSH_HEARTBEAT_SECONDS=0.01, PUSH_BROKER='accounts.push.LocalBroker')
+    async def test_stream_heartbeat_and_events(self):
+        user = CustomUser(pk=7, role='FREELANCER')
+        broker = LocalBroker()
+        with mock.patch('accounts.push.get_broker', return_value=broker):
+            stream = event_stream(user)
+            self.assertEqual(await anext(stream), "retry: 5000\n\n")
+            self.assertEqual(await anext(stream), ": ping\n\n")
+            broker.publish('role:FREELANCER', {'event': 'notification', 'data': {'title': 'Hi'}})
+            self.assertEqual(await anext(stream), 'event: notification\ndata: {"title": "Hi"}\n\n')
+            await stream.aclose()
+        self.assertEqual(broker._channels, {})
+
+
+class NotificationPushTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='fl', password='pass12345', role='FREELANCER')
+
+    def test_new_notification_is_published_after_commit(self):
+        with mock.patch('accounts.push.LocalBroker.publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                Notification.objects.create(user=self.user, title='Hi', message='-')
+        [[channel, event], _] = publish.call_args
+        self.assertEqual(channel, user_channel(self.user.pk))
+        self.assertEqual(event['event'], 'notification')
+        self.assertEqual(event['data']['title'], 'Hi')
+
+    def test_stream_needs_asgi(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('notification_stream')).status_code, 204)
+
+
+class InboxPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='fl', password='pass12345', role='FREELANCER')
+        CustomUser.objects.filter(pk=cls.user.pk).update(date_joined=timezone.now() - timezone.timedelta(days=1))
+        cls.user.refresh_from_db()
+        # Rows share timestamps across both tables so ties must be broken by the cursor
+        stamp = timezone.now() - datetime.timedelta(hours=1)
+        for n in range(7):
+            created = stamp + timezone.timedelta(minutes=n // 2)
+            note = Notification.objects.create(user=cls.user, title=f'n{n}', message='-', read=n % 3 == 0)
+            broadcast = Broadcast.objects.create(role='FREELANCER', title=f'b{n}', message='-')
+            Notification.objects.filter(pk=note.pk).update(created_at=created)
+            Broadcast.objects.filter(pk=broadcast.pk).update(created_at=created)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def walk(self, state='all'):
+        titles, cursor, pages = [], None, 0
+        while True:
+            params = {'filter': state, **({'cursor': cursor} if cursor else {})}
+            page = self.client.get(reverse('notifications_page'), params).json()
+            titles += [item['title'] for item in page['items']]
+            pages += 1
+            cursor = page['next_cursor']
+            if not cursor:
+                return titles, pages
+
+    def test_pages_cover_everything_once_in_order(self):
+        with mock.patch('accounts.notifications.INBOX_PAGE_SIZE', 4):
+            titles, pages = self.walk()
+        self.assertEqual(pages, 4)
+        self.assertEqual(sorted(titles), sorted([f'n{n}' for n in range(7)] + [f'b{n}' for n in range(7)]))
+        self.assertEqual(titles[:2], ['n6', 'b6'])
+
+    def test_filters(self):
+        unread, _ = self.walk('unread')
+        read, _ = self.walk('read')
+        self.assertEqual(sorted(read), ['n0', 'n3', 'n6'])
+        self.assertEqual(len(unread), 11)
+
+    def test_deep_pages_cost_the_same(self):
+        url = reverse('notifications_page')
+        with mock.patch('accounts.notifications.INBOX_PAGE_SIZE', 2):
+            first = self.client.get(url).json()
+            cursor = first['next_cursor']
+            for _ in range(4):
+                cursor = self.client.get(url, {'cursor': cursor}).json()['next_cursor']
+            with CaptureQueriesContext(connection) as deep:
+                self.client.get(url, {'cursor': cursor})
+            with CaptureQueriesContext(connection) as shallow:
+                self.client.get(url)
+        self.assertEqual(len(deep), len(shallow))
+
+    def test_html_inbox_has_next_cursor(self):
+        with mock.patch('accounts.notifications.INBOX_PAGE_SIZE', 4):
+            response = self.client.get(reverse('freelancer:freelancer_notifications'), {'filter': 'unread'})
+        self.assertEqual(len(response.context['notifications']), 4)
+        self.assertTrue(response.context['next_cursor'])
+
+
+class BulkMarkReadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='fl', password='pass12345', role='FREELANCER')
+        self.notes = [Notification.objects.create(user=self.user, title=f'n{n}', message='-') for n in range(3)]
+        self.broadcasts = [Broadcast.objects.create(role='FREELANCER', title=f'b{n}', message='-') for n in range(2)]
+        self.other = Notification.objects.create(
+            user=CustomUser.objects.create_user(username='other', password='pass12345'), title='x', message='-'
+        )
+        self.client.force_login(self.user)
+
+    def test_mark_all_is_one_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('mark_notifications_read'), {'all': '1'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+        self.assertEqual(response.json(), {'success': True, 'unread': 0})
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "accounts_notification"')]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(Notification.objects.filter(user=self.user, read_at__isnull=True).exists())
+        self.assertFalse(Notification.objects.get(pk=self.other.pk).read)
+        self.assertEqual(get_notification_summary(self.user)['count'], 0)
+
+    def test_mark_selected(self):
+        unread = mark_notifications_read(self.user, [self.notes[0].pk, self.other.pk], [self.broadcasts[1].pk])
+        self.assertEqual(unread, 3)
+        self.assertTrue(Notification.objects.get(pk=self.notes[0].pk).read)
+        self.assertFalse(Notification.objects.get(pk=self.other.pk).read)
+
+    def test_single_mark_sets_read_at(self):
+        self.notes[0].mark_as_read()
+        self.assertIsNotNone(Notification.objects.get(pk=self.notes[0].pk).read_at)
+
+
+class NotificationArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='fl', password='pass12345', role='FREELANCER')
+        old = timezone.now() - timezone.timedelta(days=200)
+        for n in range(5):
+            note = Notification.objects.create(user=self.user, title=f'old{n}', message='-', read=n != 4)
+            Notification.objects.filter(pk=note.pk).update(created_at=old)
+        Notification.objects.create(user=self.user, title='recent', message='-', read=True)
+
+    def test_moves_old_read_rows_in_batches(self):
+        out = StringIO()
+        call_command('archive_notifications', batch_size=3, stdout=out)
+        self.assertIn('Archived 4', out.getvalue())
+        self.assertEqual(
+            sorted(Notification.objects.values_list('title', flat=True)), ['old4', 'recent']
+        )
+        self.assertEqual(ArchivedNotification.objects.count(), 4)
+        # Nothing left to move on a second run
+        call_command('archive_notifications', stdout=out)
+        self.assertIn('Archived 0', out.getvalue())
+
+    def test_max_batches_bounds_a_run(self):
+        call_command('archive_notifications', batch_size=3, max_batches=1, stdout=StringIO())
+        self.assertEqual(ArchivedNotification.objects.count(), 3)
+
+    def test_archive_is_browsable_from_inbox(self):
+        call_command('archive_notifications', stdout=StringIO())
+        self.client.force_login(self.user)
+        page = self.client.get(reverse('notifications_page'), {'filter': 'archived'}).json()
+        self.assertEqual(len(page['items']), 4)
+        self.assertTrue(all(item['read'] for item in page['items']))
+        all_page = self.client.get(reverse('notifications_page')).json()
+        self.assertEqual([item['title'] for item in all_page['items']], ['recent', 'old4'])
+
+
+@override_settings(NOTIFICATION_COALESCE_WINDOW=600)
+class NotificationCoalescingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(username='st', password='pass12345', role='STARTUP')
+
+    def test_repeats_fold_into_one_row(self):
+        for n in range(3):
+            note = notify(self.user, 'Milestone Completed', f'm{n}', kind='milestone.completed', key='project:1')
+        self.assertEqual(Notification.objects.count(), 1)
+        note = Notification.objects.get()
+        self.assertEqual((note.count, note.message), (3, 'm2'))
+        self.assertEqual(get_notification_summary(self.user)['count'], 1)
+
+    def test_other_entity_read_row_or_old_row_start_a_new_one(self):
+        first = notify(self.user, 'T', '-', kind='milestone.completed', key='project:1')
+        notify(self.user, 'T', '-', kind='milestone.completed', key='project:2')
+        first.mark_as_read()
+        notify(self.user, 'T', '-', kind='milestone.completed', key='project:1')
+        Notification.objects.update(created_at=timezone.now() - datetime.timedelta(hours=1))
+        notify(self.user, 'T', '-', kind='milestone.completed', key='project:2')
+        self.assertEqual(Notification.objects.count(), 4)
+        self.assertFalse(Notification.objects.filter(count__gt=1).exists())
+
+    def test_digest_replaces_routine_notifications(self):
+        self.user.digest_notifications = True
+        self.user.save()
+        for _ in range(2):
+            notify(self.user, 'Milestone Completed', '-', kind='milestone.completed', key='project:1')
+        notify(self.user, 'Project Assigned', '-', kind='project.assigned', key='project:2')
+        notify(self.user, 'Direct', '-')
+        out = StringIO()
+        call_command('send_notification_digests', stdout=out)
+        self.assertIn('Sent 1', out.getvalue())
+        digest = Notification.objects.get(kind=DIGEST_KIND)
+        self.assertEqual(digest.count, 3)
+        self.assertEqual(digest.message, 'Milestone Completed ×2; Project Assigned')
+        self.assertEqual(
+            sorted(Notification.objects.values_list('title', flat=True)),
+            ['3 updates since your last digest', 'Direct'],
+        )
+        call_command('send_notification_digests', stdout=out)
+        self.assertIn('Sent 0', out.getvalue())
+
+    def test_users_without_digest_are_untouched(self):
+        notify(self.user, 'T', '-', kind='milestone.completed', key='project:1')
+        call_command('send_notification_digests', stdout=StringIO())
+        self.assertFalse(Notification.objects.filter(kind=DIGEST_KIND).exists())
+
+
+class MessagingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.startup = CustomUser.objects.create_user(username='st', password='pass12345', role='STARTUP')
+        self.freelancer = CustomUser.objects.create_user(username='fl', password='pass12345', role='FREELANCER')
+
+    def member(self, user, conversation):
+        return ConversationMember.objects.get(user=user, conversation=conversation)
+
+    def test_messages_share_a_thread_with_incremental_counters(self):
+        first = send_message(self.startup, self.freelancer, 'Hello')
+        send_message(self.startup, self.freelancer, 'Are you there?')
+        reply = send_message(self.freelancer, self.startup, 'Yes')
+        self.assertEqual(Conversation.objects.count(), 1)
+        self.assertEqual(reply.conversation_id, first.conversation_id)
+        conversation = Conversation.objects.get()
+        self.assertEqual((conversation.last_message_id, conversation.last_message_preview), (reply.pk, 'Yes'))
+        self.assertEqual(self.member(self.freelancer, conversation).unread_count, 2)
+        self.assertEqual(self.member(self.startup, conversation).unread_count, 1)
+
+        self.assertEqual(mark_conversation_read(self.freelancer, conversation.pk), 2)
+        self.assertEqual(self.member(self.freelancer, conversation).unread_count, 0)
+        self.assertFalse(Message.objects.filter(receiver=self.freelancer, read=False).exists())
+
+    def test_thread_list_is_one_query(self):
+        for n in range(30):
+            other = CustomUser.objects.create_user(username=f'm{n}', password='pass12345', role='MENTOR')
+            send_message(other, self.startup, f'hi {n}')
+        with self.assertNumQueries(1):
+            members, next_cursor = thread_page(self.startup, per_page=25)
+            items = [thread_item(member) for member in members]
+        self.assertEqual(items[0]['preview'], 'hi 29')
+        self.assertEqual(items[0]['unread'], 1)
+        members, _ = thread_page(self.startup, cursor=next_cursor, per_page=25)
+        self.assertEqual(len(members), 5)
+
+    def test_deleting_a_message_rebuilds_the_thread(self):
+        send_message(self.startup, self.freelancer, 'one')
+        last = send_message(self.startup, self.freelancer, 'two')
+        last.delete()
+        conversation = Conversation.objects.get()
+        self.assertEqual(conversation.last_message_preview, 'one')
+        self.assertEqual(self.member(self.freelancer, conversation).unread_count, 1)
+
+    def test_conversation_view_pages_history_and_marks_read(self):
+        for n in range(5):
+            send_message(self.startup, self.freelancer, f'msg {n}')
+        conversation = Conversation.objects.get()
+        self.client.force_login(self.freelancer)
+        url = reverse('conversation_detail', args=[conversation.pk])
+        with mock.patch('accounts.messaging.MESSAGE_PAGE_SIZE', 3):
+            page = self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest').json()
+            self.assertEqual([item['body'] for item in page['items']], ['msg 4', 'msg 3', 'msg 2'])
+            older = self.client.get(url, {'cursor': page['next_cursor']}, HTTP_X_REQUESTED_WITH='XMLHttpRequest').json()
+            self.assertEqual([item['body'] for item in older['items']], ['msg 1', 'msg 0'])
+        self.assertEqual(self.member(self.freelancer, conversation).unread_count, 0)
+
+        response = self.client.post(url, {'body': 'Thanks'})
+        self.assertRedirects(response, url)
+        self.assertEqual(self.member(self.startup, conversation).unread_count, 1)
+
+        self.client.force_login(self.startup)
+        self.assertContains(self.client.get(reverse('message_threads')), 'Thanks')
+        self.assertContains(self.client.get(url), 'msg 4')
+
+    def test_only_members_and_messaging_roles(self):
+        send_message(self.startup, self.freelancer, 'hi')
+        outsider = CustomUser.objects.create_user(username='ot', password='pass12345', role='FREELANCER')
+        investor = CustomUser.objects.create_user(username='inv', password='pass12345', role='INVESTOR')
+        self.client.force_login(outsider)
+        response = self.client.get(reverse('conversation_detail', args=[Conversation.objects.get().pk]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(reverse('new_message'), {'recipient': 'inv', 'body': 'hello'})
+        self.assertFormError(response.context['form'], 'recipient', "You cannot message this user.")
+        self.client.force_login(investor)
+        self.assertEqual(self.client.get(reverse('message_threads')).status_code, 403)
+
+
+def _broken_channel(event):
+    raise RuntimeError("mail server down")
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            CustomUser.objects.create_user(username=f'fl{n}', password='pass12345', role='FREELANCER')
+            for n in range(3)
+        ]
+
+    def test_publish_is_one_insert_and_delivery_is_exactly_once(self):
+        with self.assertNumQueries(1):
+            publish_event([user.pk for user in self.users], 'Hello', 'World')
+        self.assertFalse(Notification.objects.exists())
+
+        call_command('deliver_outbox', stdout=StringIO())
+        self.assertEqual(Notification.objects.filter(title='Hello').count(), 3)
+        self.assertIsNotNone(OutboxEvent.objects.get().delivered_at)
+        call_command('deliver_outbox', stdout=StringIO())
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_event_is_dropped_with_a_failed_request(self):
+        with self.assertRaises(ValueError), transaction.atomic():
+            publish_event(self.users[0], 'Hello', 'World')
+            raise ValueError
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_delivered_events_coalesce(self):
+        for _ in range(2):
+            publish_event(self.users[0], 'Milestone Completed', '-', kind='milestone.completed', key='project:1')
+        call_command('deliver_outbox', stdout=StringIO())
+        self.assertEqual(Notification.objects.get().count, 2)
+
+    @override_settings(OUTBOX_CHANNELS={
+        'in_app': 'accounts.outbox.deliver_in_app', 'email': 'accounts.tests._broken_channel',
+    }, OUTBOX_MAX_ATTEMPTS=2)
+    def test_failing_channel_rolls_back_the_whole_event(self):
+        publish_event(self.users[0], 'Hello', 'World')
+        publish_event(self.users[1], 'Other', 'World', channels=['in_app'])
+        call_command('deliver_outbox', stdout=StringIO())
+        failed = OutboxEvent.objects.get(title='Hello')
+        self.assertEqual(failed.attempts, 1)
+        self.assertGreater(failed.next_attempt_at, timezone.now())
+        self.assertIsNone(failed.delivered_at)
+        self.assertIn('mail server down', failed.last_error)
+        self.assertEqual(list(Notification.objects.values_list('title', flat=True)), ['Other'])
+
+        # Not due yet: a second run leaves it alone
+        call_command('deliver_outbox', stdout=StringIO())
+        self.assertEqual(OutboxEvent.objects.get(title='Hello').attempts, 1)
+        for _ in range(2):
+            OutboxEvent.objects.filter(title='Hello').update(next_attempt_at=timezone.now())
+            call_command('deliver_outbox', stdout=StringIO())
+        # Out of attempts after the second failure
+        self.assertEqual(OutboxEvent.objects.get(title='Hello').attempts, 2)
+
+    def test_commit_starts_a_background_drain(self):
+        with mock.patch('accounts.outbox._run_in_background', side_effect=lambda target: target()):
+            with self.captureOnCommitCallbacks(execute=True):
+                publish_event(self.users, 'Hello', 'World')
+        self.assertEqual(Notification.objects.count(), 3)
+
+
+class TempMediaMixin:
+    """
+    Uploads go through LocalBackend into a throwaway MEDIA_ROOT. With
+    `startup_profile`, setUp also makes a startup user and profile; without
+    `build_thumbnails`, the post-commit thumbnail jobs are not started.
+    """
+    startup_profile = False
+    build_thumbnails = True
+
+    def setUp(self):
+        super().setUp()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        override = override_settings(
+            MEDIA_ROOT=self.media, MEDIA_URL='/media/', UPLOAD_BACKEND='accounts.storage_backends.LocalBackend',
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        if self.startup_profile:
+            from startup.models import StartupProfile
+            self.user = CustomUser.objects.create_user(username='st', password='pass12345', role='STARTUP')
+            self.profile = StartupProfile.objects.create(user=self.user, startup_name='Acme')
+        if not self.build_thumbnails:
+            thumbnails = mock.patch('accounts.signals._run_in_background')
+            thumbnails.start()
+            self.addCleanup(thumbnails.stop)
+
+
+class UploadBackendTests(TempMediaMixin, SimpleTestCase):
+    def test_local_backend_round_trip(self):
+        backend = get_storage_backend()
+        self.assertIs(backend, get_storage_backend())
+        backend.save('logos/a b.png', b'png', 'image/png')
+        self.assertEqual(backend.url('logos/a b.png'), '/media/logos/a%20b.png')
+        with open(os.path.join(self.media, 'logos', 'a b.png'), 'rb') as f:
+            self.assertEqual(f.read(), b'png')
+        with self.assertRaises(FileExistsError):
+            backend.save('logos/a b.png', b'other')
+        backend.delete('logos/a b.png')
+        self.assertFalse(os.path.exists(os.path.join(self.media, 'logos', 'a b.png')))
+
+    def test_paths_cannot_escape_the_root(self):
+        with self.assertRaises(SuspiciousFileOperation):
+            get_storage_backend().save('../outside.txt', b'-')
+
+    def test_upload_to_supabase_uses_the_configured_backend(self):
+        url = upload_to_supabase(SimpleUploadedFile('logo.png', b'png', 'image/png'), folder='startups')
+        self.assertRegex(url, r'^/media/startups/\d{14}_logo\.png$')
+
+    def test_supabase_client_is_built_once(self):
+        with mock.patch('accounts.storage_backends._client', None), \
+                mock.patch('accounts.storage_backends.create_client') as create:
+            self.assertIs(get_supabase_client(), get_supabase_client())
+        create.assert_called_once()
+
+
+def _png(name='logo.png', color='red'):
+    buffer = BytesIO()
+    Image.new('RGB', (4, 4), color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+class AsyncUploadTests(TempMediaMixin, TestCase):
+    startup_profile = True
+    # Thumbnails have tests of their own
+    build_thumbnails = False
+
+    def _stage(self):
+        self.profile.logo = _png()
+        return save_deferred(self.profile, 'logo')[0]
+
+    def test_edit_returns_before_the_upload_and_the_worker_patches_the_field(self):
+        self.client.force_login(self.user)
+        with mock.patch('accounts.uploads._run_in_background') as run:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('startup:sprofile_edit'), {
+                    'startup_name': 'Acme', 'description': 'x', 'industry': 'AI', 'logo': _png(),
+                })
+        self.assertEqual(response.status_code, 302)
+        run.assert_called_once()
+        upload = PendingUpload.objects.get()
+        self.profile.refresh_from_db()
+        # Until the worker runs, the local copy is the placeholder
+        self.assertEqual(self.profile.logo.name, 'staging/startup_logos/logo.png')
+        self.assertEqual(self.profile.logo.url, '/media/staging/startup_logos/logo.png')
+        self.assertTrue(os.path.exists(os.path.join(self.media, upload.staged_name)))
+
+        self.assertEqual(process_upload(upload.pk), 'DONE')
+        self.profile.refresh_from_db()
+        self.assertRegex(self.profile.logo.name, r'^blobs/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertEqual(self.profile.logo.url, f'/media/{self.profile.logo.name}')
+        self.assertTrue(os.path.exists(os.path.join(self.media, self.profile.logo.name)))
+        self.assertFalse(os.path.exists(os.path.join(self.media, upload.staged_name)))
+        self.assertIsNone(process_upload(upload.pk))
+
+    @override_settings(UPLOAD_MAX_ATTEMPTS=2, UPLOAD_RETRY_BASE_DELAY=5)
+    def test_failures_are_retried_with_backoff_then_given_up(self):
+        upload = self._stage()
+        with mock.patch('accounts.storage_backends.LocalBackend.save', side_effect=OSError('bucket down')), \
+                mock.patch('accounts.uploads._schedule_retry') as schedule:
+            self.assertEqual(process_upload(upload.pk), 'PENDING')
+            schedule.assert_called_once_with(5, upload.pk)
+            # Not due yet
+            self.assertIsNone(process_upload(upload.pk))
+            PendingUpload.objects.filter(pk=upload.pk).update(next_attempt_at=timezone.now())
+            self.assertEqual(process_upload(upload.pk), 'FAILED')
+        upload.refresh_from_db()
+        self.assertEqual(upload.attempts, 2)
+        self.assertIn('bucket down', upload.last_error)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.logo.name, upload.staged_name)
+
+    def test_newer_file_is_not_overwritten(self):
+        upload = self._stage()
+        self.profile.logo = _png('newer.png', 'blue')
+        self.profile.save()
+        newer = self.profile.logo.name
+        self.assertEqual(process_upload(upload.pk), 'DONE')
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.logo.name, newer)
+        # The stale upload was stored, then let go again
+        self.assertEqual(list(StoredBlob.objects.values_list('name', flat=True)), [newer])
+        self.assertEqual(os.listdir(os.path.join(self.media, os.path.dirname(newer))), [os.path.basename(newer)])
+
+    def test_command_picks_up_abandoned_uploads(self):
+        upload = self._stage()
+        PendingUpload.objects.filter(pk=upload.pk).update(
+            status='UPLOADING', claimed_at=timezone.now() - datetime.timedelta(hours=1)
+        )
+        out = StringIO()
+        call_command('process_uploads', stdout=out)
+        self.assertIn('1 done', out.getvalue())
+        self.assertEqual(PendingUpload.objects.get().status, 'DONE')
+
+
+class _ChunkOnlyFile(BytesIO):
+    """Fails if anyone reads the whole file at once."""
+
+    def read(self, size=-1):
+        assert size and size > 0, "read the whole file into memory"
+        return super().read(size)
+
+
+class FieldStorageTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = FieldStorage('projects.ProjectProposal.file')
+
+    @override_settings(UPLOAD_DEDUP=False)
+    def test_files_are_streamed_to_the_backend(self):
+        data = os.urandom(300 * 1024)
+        name = self.storage.save('proposal_attachments/big.bin', File(_ChunkOnlyFile(data)))
+        self.assertEqual(name, 'proposal_attachments/big.bin')
+        self.assertEqual(self.storage.size(name), len(data))
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), data)
+        # Names are kept unique through the backend
+        self.assertNotEqual(self.storage.save(name, ContentFile(b'-')), name)
+
+    @override_settings(UPLOAD_DEDUP=False)
+    def test_storage_is_chosen_per_field_in_settings(self):
+        self.assertEqual(self.storage.alias, 'uploads')
+        with override_settings(UPLOAD_FIELD_STORAGES={'projects.ProjectProposal.file': 'default'}):
+            self.assertEqual(self.storage.alias, 'default')
+            name = self.storage.save('proposal_attachments/a.txt', ContentFile(b'a'))
+            self.assertEqual(self.storage.path(name), os.path.join(self.media, 'proposal_attachments', 'a.txt'))
+
+    def test_staged_and_legacy_names(self):
+        self.assertEqual(self.storage.url('staging/proposal_attachments/a.txt'), '/media/staging/proposal_attachments/a.txt')
+        self.assertEqual(self.storage.url('https://cdn.example.com/a.png'), 'https://cdn.example.com/a.png')
+
+    def test_supabase_uploads_from_disk(self):
+        with mock.patch('accounts.storage_backends.get_supabase_client') as client:
+            SupabaseBackend('bucket').save('a.bin', ContentFile(b'abc'), 'application/octet-stream')
+        path, = client().storage.from_().upload.call_args.args[1:2]
+        self.assertIsInstance(path, str)
+
+
+def _photo(name='photo.jpg', size=1200):
+    buffer = BytesIO()
+    Image.frombytes('RGB', (size, size), os.urandom(size * size * 3)).save(buffer, 'JPEG', quality=95)
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+class ThumbnailTests(TempMediaMixin, TestCase):
+    startup_profile = True
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def _employee(self, n):
+        return self.profile.employees.create(name=f'E{n}', profile_picture=_photo(f'e{n}.jpg'))
+
+    def test_employee_list_serves_small_derivatives(self):
+        employees = [self._employee(n) for n in range(3)]
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('startup:startup_employees'))
+        html = response.content.decode()
+        self.assertEqual(html.count('<source type="image/webp"'), 3)
+
+        original = os.path.getsize(os.path.join(self.media, employees[0].profile_picture.name))
+        # The 2x candidate for a 100px avatar
+        thumb = derivative_name(employees[0].profile_picture.name, 192, 'WEBP')
+        self.assertIn(f'/media/{thumb} 192w', html)
+        self.assertLess(os.path.getsize(os.path.join(self.media, thumb)) * 20, original)
+
+    def test_derivatives_are_built_after_the_save_commits(self):
+        with mock.patch('accounts.signals._run_in_background', side_effect=lambda target, *args: target(*args)):
+            with self.captureOnCommitCallbacks(execute=True):
+                employee = self._employee(0)
+        self.assertTrue(has_derivatives(employee.profile_picture.name))
+        for width in (96, 192, 384):
+            thumb = derivative_name(employee.profile_picture.name, width, 'JPEG')
+            with Image.open(os.path.join(self.media, thumb)) as image:
+                self.assertEqual(image.size, (width, width))
+
+    def test_files_without_derivatives_fall_back_to_the_original(self):
+        from django.template import Context, Template
+        template = Template('{% load thumbnails %}{% responsive_image profile.logo "50px" %}')
+        self.profile.logo = 'https://cdn.example.com/logo.png'
+        self.assertIn('<img src="https://cdn.example.com/logo.png"', template.render(Context({'profile': self.profile})))
+        self.profile.logo = 'staging/startup_logos/logo.png'
+        self.assertIn('<img src="/media/staging/startup_logos/logo.png"', template.render(Context({'profile': self.profile})))
+
+    def test_storage_errors_fall_back_to_the_original(self):
+        from django.template import Context, Template
+        employee = self._employee(0)
+        template = Template('{% load thumbnails %}{% responsive_image employee.profile_picture "100px" %}')
+        # e.g. storage3's StorageException or an httpx error from the Supabase backend
+        with mock.patch('accounts.storage.FieldStorage._open', side_effect=RuntimeError('object not found')) as open_:
+            html = template.render(Context({'employee': employee}))
+            # The failure is remembered, so the next render does not fetch the original again
+            template.render(Context({'employee': employee}))
+        self.assertEqual(open_.call_count, 1)
+        self.assertEqual(html.count('<img src="/media/'), 1)
+        self.assertNotIn('<picture>', html)
+
+        call_command('generate_thumbnails', stdout=StringIO())
+        self.assertIn('<picture>', template.render(Context({'employee': employee})))
+
+    @override_settings(UPLOAD_DEDUP=False)
+    def test_derivatives_go_with_their_original(self):
+        employee = self._employee(0)
+        name = employee.profile_picture.name
+        generate_derivatives(employee.profile_picture)
+        # Rebuilding replaces the files in place rather than adding suffixed copies
+        generate_derivatives(employee.profile_picture)
+        folder = os.path.dirname(os.path.join(self.media, derivative_name(name, 96, 'WEBP')))
+        self.assertEqual(len(os.listdir(folder)), 6)
+
+        employee.profile_picture.delete(save=False)
+        self.assertFalse(has_derivatives(name))
+        self.assertEqual(os.listdir(folder), [])
+
+    def test_derivatives_go_with_the_last_blob_reference(self):
+        employee = self._employee(0)
+        name = employee.profile_picture.name
+        generate_derivatives(employee.profile_picture)
+        with self.captureOnCommitCallbacks(execute=True):
+            employee.delete()
+        self.assertFalse(has_derivatives(name))
+
+    def test_command_backfills_missing_derivatives(self):
+        employee = self._employee(0)
+        self.assertFalse(has_derivatives(employee.profile_picture.name))
+        out = StringIO()
+        call_command('generate_thumbnails', stdout=out)
+        self.assertIn('1 image(s)', out.getvalue())
+        self.assertTrue(has_derivatives(employee.profile_picture.name))
+
+
+class DedupStorageTests(TempMediaMixin, TestCase):
+    startup_profile = True
+    # Thumbnails have tests of their own
+    build_thumbnails = False
+
+    def test_identical_files_are_stored_once(self):
+        first = self.profile.employees.create(name='A', profile_picture=_png('a.png'))
+        with mock.patch('accounts.storage_backends.LocalBackend.save') as save:
+            second = self.profile.employees.create(name='B', profile_picture=_png('b.png'))
+        save.assert_not_called()
+        self.assertEqual(first.profile_picture.name, second.profile_picture.name)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 2)
+
+    def test_last_reference_deletes_the_file(self):
+        first = self.profile.employees.create(name='A', profile_picture=_png('a.png'))
+        second = self.profile.employees.create(name='B', profile_picture=_png('b.png'))
+        path = os.path.join(self.media, first.profile_picture.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.profile_picture = _png('other.png', 'blue')
+            first.save()
+        self.assertEqual(StoredBlob.objects.get(name=second.profile_picture.name).ref_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(StoredBlob.objects.filter(name=second.profile_picture.name).exists())
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(os.path.join(self.media, first.profile_picture.name)))
+
+    def test_deferred_file_fields_are_released(self):
+        employee = self.profile.employees.create(name='A', profile_picture=_png('a.png'))
+        path = os.path.join(self.media, employee.profile_picture.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            renamed = self.profile.employees.only('id', 'startup', 'name').get(pk=employee.pk)
+            renamed.name = 'B'
+            renamed.save()
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.employees.only('id', 'startup').get(pk=employee.pk).delete()
+        self.assertFalse(StoredBlob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_resubmitting_an_unchanged_logo_is_metadata_only(self):
+        self.client.force_login(self.user)
+        data = {'startup_name': 'Acme', 'description': 'x', 'industry': 'AI'}
+        with mock.patch('accounts.uploads._run_in_background', side_effect=lambda target, *args: target(*args)):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('startup:sprofile_edit'), {**data, 'logo': _png()})
+        self.profile.refresh_from_db()
+        stored = self.profile.logo.name
+
+        with mock.patch('accounts.storage_backends.LocalBackend.save') as save:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('startup:sprofile_edit'), {**data, 'logo': _png()})
+        save.assert_not_called()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.logo.name, stored)
+        self.assertEqual(PendingUpload.objects.count(), 1)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+
+    def test_upload_handler_hashes_while_receiving(self):
+        handler = HashingMemoryFileUploadHandler()
+        handler.handle_raw_input(None, {}, 10, 'boundary')
+        with self.assertRaises(StopFutureHandlers):
+            handler.new_file('logo', 'logo.png', 'image/png', 10)
+        handler.receive_data_chunk(b'01234', 0)
+        handler.receive_data_chunk(b'56789', 5)
+        upload = handler.file_complete(10)
+        self.assertEqual(upload.sha256, hashlib.sha256(b'0123456789').hexdigest())
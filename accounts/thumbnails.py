@@ -0,0 +1,135 @@
+# accounts/thumbnails.py
+import hashlib
+import os
+import tempfile
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from PIL import Image, ImageOps
+
+from .storage import STAGING_DIR
+
+THUMBNAIL_DIR = 'thumbnails/'
+
+# Derivatives are cached on local disk under MEDIA_ROOT, whatever storage holds the original
+thumbnail_storage = FileSystemStorage()
+
+
+def thumbnail_fields(model):
+    """Names of `model`'s fields listed in settings.THUMBNAIL_FIELDS."""
+    prefix = f"{model._meta.app_label}.{model.__name__}."
+    return [key[len(prefix):] for key in settings.THUMBNAIL_FIELDS if key.startswith(prefix)]
+
+
+def _fallback_format(name):
+    # PNG and GIF sources may be transparent, which JPEG cannot carry
+    return 'PNG' if os.path.splitext(name)[1].lower() in ('.png', '.gif') else 'JPEG'
+
+
+def _failure_key(name):
+    # Hashed: file names may hold characters cache backends reject in keys
+    return "thumbnail-failed:" + hashlib.md5(name.encode()).hexdigest()
+
+
+def clear_failure(name):
+    """Let the next render try to build the derivatives of `name` again."""
+    cache.delete(_failure_key(name))
+
+
+def derivative_name(name, width, fmt):
+    return f"{THUMBNAIL_DIR}{os.path.splitext(name)[0]}.{width}.{fmt.lower()}"
+
+
+def derivatives(name):
+    """
+    {format: [(width, name), ...]} for every derivative of the file `name`,
+    WebP first, then the JPEG/PNG fallback for browsers without WebP.
+    """
+    widths = sorted(settings.THUMBNAIL_WIDTHS)
+    return {
+        fmt: [(width, derivative_name(name, width, fmt)) for width in widths]
+        for fmt in ('WEBP', _fallback_format(name))
+    }
+
+
+def has_derivatives(name):
+    # generate_derivatives() writes the largest fallback last
+    return thumbnail_storage.exists(list(derivatives(name).values())[-1][-1][1])
+
+
+def generate_derivatives(field_file):
+    """
+    Write every configured width of `field_file` in WebP and in its fallback
+    format. The original is read once from its storage, wherever that is;
+    images narrower than a width are stored at their own size, never scaled up.
+    """
+    name = field_file.name
+    with field_file.storage.open(name) as f:
+        image = ImageOps.exif_transpose(Image.open(f))
+        image.load()
+    for fmt, sizes in derivatives(name).items():
+        for width, target in sizes:
+            copy = image.copy()
+            copy.thumbnail((width, width * 4), Image.LANCZOS)
+            if fmt == 'JPEG' and copy.mode not in ('RGB', 'L'):
+                copy = copy.convert('RGB')
+            _write(target, lambda f: copy.save(f, fmt, quality=settings.THUMBNAIL_QUALITY, optimize=True))
+
+
+def _write(target, write):
+    """
+    Write `target` through a temporary file and rename it into place, so a
+    concurrent render sees the old file or the new one, never a suffixed copy.
+    """
+    path = thumbnail_storage.path(target)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.chmod(temp, thumbnail_storage.file_permissions_mode or 0o644)
+        os.replace(temp, path)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+def delete_derivatives(name):
+    """Remove the cached derivatives of `name`, e.g. once the original is gone and the name may be reused."""
+    if can_have_derivatives(name):
+        clear_failure(name)
+        for sizes in derivatives(name).values():
+            for _, target in sizes:
+                thumbnail_storage.delete(target)
+
+
+def can_have_derivatives(name):
+    # Staged uploads are about to move, and old rows may hold a bare URL
+    return bool(name) and not name.startswith(STAGING_DIR) and not urlsplit(name).scheme
+
+
+def ensure_derivatives(field_file):
+    """
+    Derivatives of `field_file`, generated now if they are not on disk yet.
+    Returns None for a file that has none: not a readable image, missing or
+    unreachable in its storage, still staged, or only a URL (rows from
+    before FieldStorage). Callers then serve the original. A failure is
+    remembered for THUMBNAIL_FAILURE_TTL seconds, so renders in the meantime
+    do not fetch the original again.
+    """
+    name = field_file.name
+    if not can_have_derivatives(name):
+        return None
+    if not has_derivatives(name):
+        if cache.get(_failure_key(name)):
+            return None
+        try:
+            generate_derivatives(field_file)
+        except Exception as exc:
+            # Bad images, but also storage and network errors from a remote backend
+            print(f"⚠️ Could not build thumbnails for {name}: {exc}")
+            cache.set(_failure_key(name), 1, settings.THUMBNAIL_FAILURE_TTL)
+            return None
+    return derivatives(name)
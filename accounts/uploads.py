@@ -0,0 +1,160 @@
+# accounts/uploads.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PendingUpload
+from .storage import STAGING_DIR, staging_storage
+
+# An UPLOADING row older than this belongs to a worker that died mid-transfer
+UPLOAD_CLAIM_TIMEOUT = timedelta(minutes=10)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.UPLOAD_WORKERS, thread_name_prefix="upload")
+    return _executor
+
+
+def _run_in_background(target, *args):
+    _get_executor().submit(target, *args)
+
+
+def save_deferred(instance, *field_names):
+    """
+    Save `instance`, but stage any new file in `field_names` on local disk
+    instead of sending it to the field's storage during the request. Each
+    staged file is moved by a pool thread once the transaction commits;
+    until then its local copy is served as the placeholder. Returns the
+    PendingUpload rows.
+    """
+    staged = []
+    for field_name in field_names:
+        field_file = getattr(instance, field_name)
+        if not field_file or field_file._committed:
+            continue
+        if field_file.storage.is_stored(field_file.file):
+            # The bytes are stored already, so saving is a metadata-only update
+            continue
+        destination = field_file.field.generate_filename(instance, field_file.name)
+        field_file.name = staging_storage.save(STAGING_DIR + destination, field_file.file)
+        field_file._committed = True
+        staged.append((field_name, field_file.name, destination))
+
+    instance.save()
+    uploads = []
+    for field_name, staged_name, destination in staged:
+        upload = PendingUpload.objects.create(
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=instance.pk,
+            field_name=field_name,
+            staged_name=staged_name,
+            destination=destination,
+        )
+        transaction.on_commit(lambda pk=upload.pk: _run_in_background(_process_in_background, pk))
+        uploads.append(upload)
+    return uploads
+
+
+def retry_delay(attempts):
+    """Exponential backoff after the `attempts`-th failure, capped at UPLOAD_RETRY_MAX_DELAY seconds."""
+    return min(settings.UPLOAD_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.UPLOAD_RETRY_MAX_DELAY)
+
+
+# -----------------------------
+# Worker
+# -----------------------------
+def process_upload(upload_id, retry_in_process=True):
+    """
+    Make one attempt at a due upload. The row is claimed with a conditional
+    UPDATE, so a pool thread and the process_uploads command never transfer
+    the same file twice. On success the stored name replaces the placeholder,
+    unless the field has moved on to a newer file in the meantime. A failure
+    is rescheduled with backoff, up to UPLOAD_MAX_ATTEMPTS attempts, and with
+    `retry_in_process` a timer re-queues it on this process's pool. Returns the new status, or None if the upload was not ours to run.
+    """
+    now = timezone.now()
+    claimed = PendingUpload.objects.filter(pk=upload_id, status='PENDING', next_attempt_at__lte=now).update(
+        status='UPLOADING', claimed_at=now, attempts=F('attempts') + 1
+    )
+    if not claimed:
+        return None
+    upload = PendingUpload.objects.select_related('content_type').get(pk=upload_id)
+    model = upload.content_type.model_class()
+    field = model._meta.get_field(upload.field_name)
+
+    try:
+        with staging_storage.open(upload.staged_name) as f:
+            name = field.storage.save(upload.destination, f, max_length=field.max_length)
+    except Exception as exc:
+        return _reschedule(upload, exc, retry_in_process)
+
+    with transaction.atomic():
+        patched = model._default_manager.filter(
+            pk=upload.object_id, **{upload.field_name: upload.staged_name}
+        ).update(**{upload.field_name: name})
+        PendingUpload.objects.filter(pk=upload.pk).update(status='DONE', url=field.storage.url(name), last_error='')
+    if not patched:
+        # Replaced or deleted while we were uploading; nothing points at the stored copy
+        field.storage.release(name)
+    staging_storage.delete(upload.staged_name)
+    return 'DONE'
+
+
+def _reschedule(upload, exc, retry_in_process):
+    print(f"🚨 Upload of {upload.staged_name} failed (attempt {upload.attempts}): {exc}")
+    if upload.attempts >= settings.UPLOAD_MAX_ATTEMPTS:
+        PendingUpload.objects.filter(pk=upload.pk).update(status='FAILED', last_error=repr(exc))
+        return 'FAILED'
+    delay = retry_delay(upload.attempts)
+    PendingUpload.objects.filter(pk=upload.pk).update(
+        status='PENDING', next_attempt_at=timezone.now() + timedelta(seconds=delay), last_error=repr(exc)
+    )
+    if retry_in_process:
+        _schedule_retry(delay, upload.pk)
+    return 'PENDING'
+
+
+def _schedule_retry(delay, upload_id):
+    timer = threading.Timer(delay, _run_in_background, args=(_process_in_background, upload_id))
+    timer.daemon = True
+    timer.start()
+
+
+def _process_in_background(upload_id):
+    close_old_connections()
+    try:
+        process_upload(upload_id)
+    finally:
+        close_old_connections()
+
+
+def process_due_uploads(limit=None):
+    """
+    Run every upload that is due, oldest first, including those whose worker
+    died mid-transfer. Used by the process_uploads command to pick up what the
+    in-process retries missed, e.g. across a restart. Returns {status: count}.
+    """
+    now = timezone.now()
+    PendingUpload.objects.filter(status='UPLOADING', claimed_at__lt=now - UPLOAD_CLAIM_TIMEOUT).update(
+        status='PENDING'
+    )
+    due = PendingUpload.objects.filter(status='PENDING', next_attempt_at__lte=now).order_by('next_attempt_at')
+    results = {}
+    for upload_id in due.values_list('pk', flat=True)[:limit]:
+        status = process_upload(upload_id, retry_in_process=False)
+        if status:
+            results[status] = results.get(status, 0) + 1
+    return results
@@ -5,4 +5,11 @@ urlpatterns = [
     
     path("", views.index, name="index"),
     path('logout/', views.logout_view, name='logout'),
+    path('broadcasts/<int:pk>/read/', views.mark_broadcast_read, name='mark_broadcast_read'),
+    path('notifications/read/', views.mark_notifications_read, name='mark_notifications_read'),
+    path('notifications/page/', views.notifications_page, name='notifications_page'),
+    path('notifications/stream/', views.notification_stream, name='notification_stream'),
+    path('messages/', views.message_threads, name='message_threads'),
+    path('messages/new/', views.new_message, name='new_message'),
+    path('messages/<int:pk>/', views.conversation_detail, name='conversation_detail'),
 ]
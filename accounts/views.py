@@ -1,12 +1,31 @@
-from django.shortcuts import render, redirect
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from .forms import LoginForm
-from projects.models import Project
-from freelancer.models import FreelancerProfile
-from startup.models import StartupProfile
-from mentors.models import MentorProfile
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from .forms import LoginForm, MessageForm, NewMessageForm
+from .landing import get_landing_counts
+from .messaging import (
+    MESSAGING_ROLES,
+    mark_conversation_read,
+    message_item,
+    message_page,
+    send_message,
+    thread_item,
+    thread_page,
+)
+from .models import ConversationMember
+from .push import event_stream
+from .notifications import (
+    inbox_context,
+    inbox_item,
+    mark_broadcast_read as record_broadcast_read,
+    mark_notifications_read as bulk_mark_read,
+    visible_broadcasts,
+)
 
 
 def login_view(request):
@@ -42,10 +61,161 @@ def logout_view(request):
 
 
 def index(request):
-    context = {
-        'projects_count': Project.objects.count(),
-        'freelancers_count': FreelancerProfile.objects.count(),
-        'startups_count': StartupProfile.objects.count(),
-        'mentors_count': MentorProfile.objects.count(),
-    }
-    return render(request, 'index.html', context)
\ No newline at end of file
+    response = render(request, 'index.html', get_landing_counts())
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.LANDING_COUNTS_TTL)
+    return response
+
+
+@login_required
+def mark_broadcast_read(request, pk):
+    if request.method != "POST":
+        return HttpResponseForbidden("Invalid request method")
+
+    broadcast = get_object_or_404(visible_broadcasts(request.user), pk=pk)
+    record_broadcast_read(request.user, broadcast)
+
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'success': True, 'id': broadcast.id})
+    return redirect(request.POST.get('next') or request.META.get('HTTP_REFERER') or 'index')
+
+
+def _ids(values):
+    return [int(value) for value in values if value.isdigit()]
+
+
+@login_required
+def mark_notifications_read(request):
+    """
+    Mark everything (`all=1`) or the selected `ids` / `broadcast_ids` as read.
+    Answers AJAX calls with the new unread count so the UI need not refetch.
+    """
+    if request.method != "POST":
+        return HttpResponseForbidden("Invalid request method")
+
+    if request.POST.get('all'):
+        unread = bulk_mark_read(request.user)
+    else:
+        unread = bulk_mark_read(
+            request.user, _ids(request.POST.getlist('ids')), _ids(request.POST.getlist('broadcast_ids'))
+        )
+
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'success': True, 'unread': unread})
+    return redirect(request.POST.get('next') or request.META.get('HTTP_REFERER') or 'index')
+
+
+@login_required
+def notifications_page(request):
+    """One inbox page as JSON for infinite scroll; takes the same ?cursor= and ?filter= as the HTML pages."""
+    context = inbox_context(request)
+    return JsonResponse({
+        'items': [inbox_item(note) for note in context['notifications']],
+        'next_cursor': context['next_cursor'],
+        'filter': context['inbox_filter'],
+    })
+
+
+@login_required
+async def notification_stream(request):
+    """Server-Sent Events feed of the user's new notifications and status changes."""
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would hold a thread per client; 204 tells EventSource not to reconnect
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    response = StreamingHttpResponse(event_stream(user), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# -----------------------------
+# Messaging
+# -----------------------------
+MESSAGING_BASES = {
+    'STARTUP': 'base_startup.html',
+    'FREELANCER': 'base_freelancer.html',
+    'MENTOR': 'mentor_base.html',
+}
+
+
+def _messaging_context(request, **context):
+    """Pick the panel layout for the user's role and the profile it expects."""
+    user = request.user
+    context['base_template'] = MESSAGING_BASES[user.role]
+    if user.role == 'STARTUP':
+        context['profile'] = getattr(user, 'startup_profile', None)
+    elif user.role == 'MENTOR':
+        context['mentor_profile'] = getattr(user, 'mentor_profile', None)
+    return context
+
+
+def _is_ajax(request):
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
+
+@login_required
+def message_threads(request):
+    """The user's conversations, most recently active first; JSON for AJAX calls."""
+    if request.user.role not in MESSAGING_ROLES:
+        return HttpResponseForbidden("Messaging is not available for this account")
+
+    members, next_cursor = thread_page(request.user, request.GET.get('cursor'))
+    if _is_ajax(request):
+        return JsonResponse({'items': [thread_item(member) for member in members], 'next_cursor': next_cursor})
+    return render(request, 'message_threads.html', _messaging_context(
+        request, threads=members, next_cursor=next_cursor
+    ))
+
+
+@login_required
+def conversation_detail(request, pk):
+    """One thread: reading it marks it read, posting to it sends a reply."""
+    if request.user.role not in MESSAGING_ROLES:
+        return HttpResponseForbidden("Messaging is not available for this account")
+    member = get_object_or_404(
+        ConversationMember.objects.select_related('other_user'), conversation=pk, user=request.user
+    )
+
+    if request.method == 'POST':
+        form = MessageForm(request.POST)
+        if form.is_valid():
+            send_message(request.user, member.other_user, form.cleaned_data['body'])
+            return redirect('conversation_detail', pk=pk)
+    else:
+        form = MessageForm()
+
+    mark_conversation_read(request.user, pk)
+    history, next_cursor = message_page(pk, request.GET.get('cursor'))
+    if _is_ajax(request):
+        return JsonResponse({'items': [message_item(message) for message in history], 'next_cursor': next_cursor})
+    return render(request, 'conversation.html', _messaging_context(
+        request,
+        member=member,
+        # Pages come newest first; show them oldest at the top
+        history=history[::-1],
+        next_cursor=next_cursor,
+        form=form,
+    ))
+
+
+@login_required
+def new_message(request):
+    """Start (or continue) a conversation with another user; `?to=<username>` pre-fills the recipient."""
+    if request.user.role not in MESSAGING_ROLES:
+        return HttpResponseForbidden("Messaging is not available for this account")
+
+    if request.method == 'POST':
+        form = NewMessageForm(request.POST, sender=request.user)
+        if form.is_valid():
+            message = send_message(
+                request.user, form.cleaned_data['recipient'],
+                form.cleaned_data['body'], form.cleaned_data['subject'],
+            )
+            return redirect('conversation_detail', pk=message.conversation_id)
+    else:
+        form = NewMessageForm(initial={'recipient': request.GET.get('to', '')}, sender=request.user)
+    return render(request, 'new_message.html', _messaging_context(request, form=form))
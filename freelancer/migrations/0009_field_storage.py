@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:29
+
+import accounts.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('freelancer', '0008_remove_freelancerearning_freelancer_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='freelancerprofile',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, storage=accounts.storage.FieldStorage('freelancer.FreelancerProfile.profile_picture'), upload_to='freelancer/'),
+        ),
+        migrations.AlterField(
+            model_name='freelancerprofile',
+            name='resume',
+            field=models.FileField(blank=True, null=True, storage=accounts.storage.FieldStorage('freelancer.FreelancerProfile.resume'), upload_to=''),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from accounts.models import CustomUser
+from accounts.storage import FieldStorage
 import datetime
 from django.utils import timezone
 
@@ -18,8 +19,10 @@ class FreelancerProfile(models.Model):
         choices=[('AVAILABLE', 'Available'), ('BUSY', 'Busy'), ('OFFLINE', 'Offline')],
         default='AVAILABLE'
     )
-    profile_picture = models.ImageField(upload_to="freelancer/", blank=True, null=True)
-    resume = models.FileField(blank=True, null=True)
+    profile_picture = models.ImageField(
+        upload_to="freelancer/", storage=FieldStorage("freelancer.FreelancerProfile.profile_picture"), blank=True, null=True
+    )
+    resume = models.FileField(storage=FieldStorage("freelancer.FreelancerProfile.resume"), blank=True, null=True)
     total_earnings = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     
     # ✅ Correct: auto_now_add alone
@@ -0,0 +1,57 @@
+# freelancer/stats.py
+from django.db.models import Count, Q
+
+from accounts.notifications import get_notification_summary
+from projects.models import Project, ProjectProposal
+
+
+def get_freelancer_stats(profile):
+    """
+    Compute the freelancer dashboard numbers with one aggregate per table.
+    The unread count comes from the cached notification summary.
+    """
+    proposals = ProjectProposal.objects.filter(freelancer=profile).aggregate(
+        proposals_count=Count('id'),
+        proposals_pending=Count('id', filter=Q(status='PENDING')),
+        proposals_approved=Count('id', filter=Q(status='APPROVED')),
+        proposals_rejected=Count('id', filter=Q(status='REJECTED')),
+    )
+    projects = Project.objects.filter(assignment__freelancer=profile).aggregate(
+        projects_assigned=Count('id'),
+        projects_completed=Count('id', filter=Q(status='COMPLETED')),
+    )
+    return {
+        **proposals,
+        **projects,
+        'notifications_unread': get_notification_summary(profile.user)['count'],
+    }
+
+
+def dashboard_cards(stats):
+    """Stat cards rendered by Fdashboard.html."""
+    return [
+        {'title': 'Total Proposals', 'value': stats['proposals_count']},
+        {'title': 'Pending Proposals', 'value': stats['proposals_pending']},
+        {'title': 'Assigned Projects', 'value': stats['projects_assigned']},
+        {'title': 'Completed Projects', 'value': stats['projects_completed']},
+        {'title': 'New Notifications', 'value': stats['notifications_unread']},
+    ]
+
+
+def dashboard_payload(stats):
+    """Shape the flat stats dict into the JSON served by dashboard_data."""
+    return {
+        'proposals': {
+            'total': stats['proposals_count'],
+            'pending': stats['proposals_pending'],
+            'approved': stats['proposals_approved'],
+            'rejected': stats['proposals_rejected'],
+        },
+        'projects': {
+            'assigned': stats['projects_assigned'],
+            'completed': stats['projects_completed'],
+        },
+        'notifications': {
+            'unread': stats['notifications_unread'],
+        },
+    }
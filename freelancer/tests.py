@@ -1,3 +1,80 @@
+import datetime
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import CustomUser, Notification
+from accounts.notifications import invalidate_notification_summary
+from projects.models import Project, ProjectProposal, ProjectAssignment
+from startup.models import StartupProfile
+from .models import FreelancerProfile
+from .stats import get_freelancer_stats
+
+
+class FreelancerDashboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='fl', password='pass12345', role='FREELANCER')
+        cls.profile = FreelancerProfile.objects.create(user=cls.user, full_name='Free Lancer')
+        startup_user = CustomUser.objects.create_user(username='acme', password='pass12345', role='STARTUP')
+        startup = StartupProfile.objects.create(user=startup_user, startup_name='Acme')
+
+        today = datetime.date.today()
+        for status in ['ONGOING', 'COMPLETED']:
+            project = Project.objects.create(startup=startup, name=status, description='-', start_date=today, status=status)
+            ProjectAssignment.objects.create(project=project, freelancer=cls.profile)
+        for status in ['PENDING', 'PENDING', 'APPROVED']:
+            ProjectProposal.objects.create(
+                project=project, freelancer=cls.profile, proposal_text='-', file='proposal.pdf', status=status
+            )
+        Notification.objects.create(user=cls.user, title='Hi', message='-')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_stats_one_query_per_table(self):
+        # proposals + projects + notification summary on a cold cache: broadcast cursor,
+        # then unread count, recent and unread lists for notifications and broadcasts each
+        with self.assertNumQueries(9):
+            stats = get_freelancer_stats(self.profile)
+        self.assertEqual(stats['proposals_count'], 3)
+        self.assertEqual(stats['proposals_pending'], 2)
+        self.assertEqual(stats['projects_assigned'], 2)
+        self.assertEqual(stats['projects_completed'], 1)
+        self.assertEqual(stats['notifications_unread'], 1)
+
+    def test_dashboard_data(self):
+        self.client.force_login(self.user)
+        data = self.client.get(reverse('freelancer:dashboard_data')).json()
+        self.assertEqual(data['proposals']['pending'], 2)
+        self.assertEqual(data['projects']['completed'], 1)
+        self.assertEqual(data['notifications']['unread'], 1)
+
+    def test_dashboard_renders(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('freelancer:freelancer_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['stats'][0]['value'], 3)
+
+    def test_dashboard_fragments_refresh_after_write(self):
+        self.client.force_login(self.user)
+        url = reverse('freelancer:freelancer_dashboard')
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(user=self.user, title='New', message='Fresh notification')
+        response = self.client.get(url)
+        self.assertContains(response, 'Fresh notification')
+        self.assertEqual(response.context['stats'][4]['value'], 2)
 
-# Create your tests here.
+    def test_unchanged_fragments_render_from_cache(self):
+        self.client.force_login(self.user)
+        url = reverse('freelancer:freelancer_dashboard')
+        # The first render sets the CSRF cookie, which the notification fragment varies on
+        self.client.get(url)
+        self.client.get(url)
+        # Change the row without signals and drop the summary cache: only the fragment is left stale
+        Notification.objects.filter(user=self.user).update(message='Edited silently')
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_notification_summary(self.user.pk)
+        self.assertNotContains(self.client.get(url), 'Edited silently')
@@ -6,6 +6,7 @@ urlpatterns = [
     # Auth / Dashboard
     # -----------------------------
     path("dashboard/", views.freelancer_dashboard, name="freelancer_dashboard"),
+    path("dashboard/data/", views.dashboard_data, name="dashboard_data"),
     path("signup/", views.freelancer_signup, name="freelancer_signup"),
     path("notification/read/<int:pk>/", views.mark_notification_read, name="mark_notification_read"),
     
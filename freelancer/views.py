@@ -6,7 +6,7 @@ from django.contrib.auth import login
 from django.shortcuts import get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 
 from .forms import (
     FreelancerProfileForm,
@@ -14,8 +14,10 @@ from .forms import (
     MilestoneForm
 )
 from accounts.models import Notification
+from accounts.notifications import get_notification_summary, inbox_context
 from projects.models import Project, ProjectProposal
 from .models import FreelancerProfile
+from .stats import get_freelancer_stats, dashboard_cards, dashboard_payload
 from accounts.supabase_helper import upload_to_supabase
 
 
@@ -76,33 +78,28 @@ def freelancer_signup(request):
 def freelancer_dashboard(request):
     profile = request.user.freelancer_profile
     user = request.user
-    proposals = ProjectProposal.objects.filter(freelancer=profile)
-    
-    # Get assigned projects through ProjectAssignment
-    assigned_projects = Project.objects.filter(assignment__freelancer=profile)
-    completed_projects = assigned_projects.filter(status='COMPLETED')
 
     # Remove earnings calculation (feature temporarily removed)
     # earnings = sum(profile.earnings.values_list('amount', flat=True))
 
-    # Prepare stats as a list of dictionaries (without earnings)
-    stats = [
-        {'title': 'Total Proposals', 'value': proposals.count()},
-        {'title': 'Pending Proposals', 'value': proposals.filter(status='PENDING').count()},
-        {'title': 'Assigned Projects', 'value': assigned_projects.count()},
-        {'title': 'Completed Projects', 'value': completed_projects.count()},
-        {'title': 'New Notifications', 'value': request.user.notifications.filter(read=False).count()},
-    ]
-
     context = {
         'user': user,
         'profile': profile,
-        'stats': stats,
-        'notifications': request.user.notifications.filter(read=False).order_by('-created_at')[:5],
+        # Only read when a {% cache %} fragment is rendered, so a cache hit skips the queries
+        'stats': SimpleLazyObject(lambda: dashboard_cards(get_freelancer_stats(profile))),
+        'notifications': SimpleLazyObject(lambda: get_notification_summary(user)['unread']),
     }
     return render(request, 'Fdashboard.html', context)
 
 
+@login_required
+@role_required('FREELANCER')
+def dashboard_data(request):
+    """Dashboard numbers as JSON so widgets can refresh without re-rendering the page."""
+    stats = get_freelancer_stats(request.user.freelancer_profile)
+    return JsonResponse(dashboard_payload(stats))
+
+
 from django.http import JsonResponse
 @login_required
 def mark_notification_read(request, pk):
@@ -111,22 +108,7 @@ def mark_notification_read(request, pk):
 
     note = get_object_or_404(Notification, pk=pk, user=request.user)
 
-    # mark read and set read_at if the field exists
-    if not note.read:
-        note.read = True
-        # prepare fields list defensively
-        update_fields = ['read']
-        if hasattr(note, 'read_at'):
-            try:
-                note.read_at = timezone.now()
-                update_fields.append('read_at')
-            except Exception:
-                # fallback: don't include read_at if any unexpected error
-                pass
-        note.save(update_fields=update_fields)
-    else:
-        # already read — nothing to change
-        pass
+    note.mark_as_read()
 
     # respond
     is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest' or request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest'
@@ -511,14 +493,10 @@ def update_milestone(request, milestone_id):
 @login_required
 @role_required('FREELANCER')
 def freelancer_notifications(request):
-    notifications = Notification.objects.filter(
-        user=request.user
-    ).order_by('-created_at')
-
     return render(
         request,
         'notifications.html',
-        {'notifications': notifications}
+        inbox_context(request)
     )
 
 
@@ -534,11 +512,12 @@ def freelancer_notifications(request):
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 
 from .models import Milestone, FreelancerProfile
 from .forms import MilestoneForm
 from projects.models import Project
-from accounts.models import Notification
+from accounts.outbox import publish_event
 
 
 # ----------------------------------------
@@ -576,6 +555,7 @@ def milestone_list(request, project_id):
 # ----------------------------------------
 @login_required
 @role_required('FREELANCER')
+@transaction.atomic
 def create_milestone(request, project_id):
     freelancer = request.user.freelancer_profile
 
@@ -598,10 +578,12 @@ def create_milestone(request, project_id):
             milestone.freelancer = freelancer
             milestone.save()
 
-            Notification.objects.create(
-                user=project.startup.user,
+            publish_event(
+                project.startup.user_id,
                 title="New Milestone Added",
-                message=f"{freelancer.full_name} added milestone '{milestone.title}' for project '{project.name}'."
+                message=f"{freelancer.full_name} added milestone '{milestone.title}' for project '{project.name}'.",
+                kind='milestone.created',
+                key=f'project:{project.id}',
             )
 
             messages.success(request, "Milestone created successfully.")
@@ -625,6 +607,7 @@ def create_milestone(request, project_id):
 # ----------------------------------------
 @login_required
 @role_required('FREELANCER')
+@transaction.atomic
 def update_milestone(request, milestone_id):
     freelancer = request.user.freelancer_profile
 
@@ -651,10 +634,12 @@ def update_milestone(request, milestone_id):
                 updated.progress = 100
                 updated.status = 'COMPLETED'
 
-                Notification.objects.create(
-                    user=project.startup.user,
+                publish_event(
+                    project.startup.user_id,
                     title="Milestone Completed",
-                    message=f"{freelancer.full_name} completed milestone '{updated.title}'."
+                    message=f"{freelancer.full_name} completed milestone '{updated.title}'.",
+                    kind='milestone.completed',
+                    key=f'project:{project.id}',
                 )
             elif updated.progress > 0:
                 updated.status = 'IN_PROGRESS'
@@ -2,6 +2,7 @@
 Django settings for incubation project.
 """
 
+import os
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -68,6 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'accounts.context_processors.notifications',
             ],
         },
     },
@@ -88,6 +90,51 @@ DATABASES = {
 }
 
 
+# -------------------------
+# CACHE
+# -------------------------
+# Per-process memory cache; point this at a shared backend (Redis/Memcached)
+# when running more than one worker so invalidations reach every process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds a user's cached unread count / latest notifications may live
+NOTIFICATION_CACHE_TIMEOUT = 300
+
+# Read notifications older than this many days are moved out by archive_notifications
+NOTIFICATION_ARCHIVE_AFTER_DAYS = 90
+
+# Seconds after its last repeat that a notification still absorbs new ones of the same kind/entity
+NOTIFICATION_COALESCE_WINDOW = 3600
+
+# Notification outbox: delivery channel -> handler taking an OutboxEvent (add e.g. email here)
+OUTBOX_CHANNELS = {
+    'in_app': 'accounts.outbox.deliver_in_app',
+}
+# Kick off a background drain when a transaction that published events commits;
+# run deliver_outbox from cron as well to pick up anything a crashed drain left behind
+OUTBOX_DELIVER_ON_COMMIT = True
+# Failed deliveries are retried this many times, after 5s, 10s, 20s, ... (capped),
+# then left in the table for inspection
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE_DELAY = 5
+OUTBOX_RETRY_MAX_DELAY = 300
+
+# Seconds between landing page counter refreshes (also the anonymous max-age)
+LANDING_COUNTS_TTL = 60
+
+# Live notification push (Server-Sent Events; needs an ASGI server such as uvicorn or daphne).
+# The local broker only reaches clients on the same worker process.
+PUSH_BROKER = 'accounts.push.LocalBroker'
+# Seconds between keep-alive comments on an idle stream
+PUSH_HEARTBEAT_SECONDS = 20
+# Events buffered per client before it is told to resync instead
+PUSH_QUEUE_SIZE = 100
+
+
 # -------------------------
 # AUTH
 # -------------------------
@@ -122,5 +169,50 @@ STATIC_URL = '/static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploaded logos and files go to a Supabase storage bucket when one is configured,
+# otherwise to MEDIA_ROOT through the local backend (same API; tests and offline use)
+SUPABASE_URL = os.getenv('SUPABASE_URL', '')
+SUPABASE_KEY = os.getenv('SUPABASE_KEY', '')
+SUPABASE_BUCKET = os.getenv('SUPABASE_BUCKET', 'uploads')
+UPLOAD_BACKEND = os.getenv('UPLOAD_BACKEND') or (
+    'accounts.storage_backends.SupabaseBackend' if SUPABASE_URL else 'accounts.storage_backends.LocalBackend'
+)
+# Every upload field uses accounts.storage.FieldStorage, which picks its STORAGES alias
+# here; 'uploads' streams to UPLOAD_BACKEND, 'default' is plain MEDIA_ROOT
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    'uploads': {'BACKEND': 'accounts.storage.BackendStorage'},
+}
+UPLOAD_DEFAULT_STORAGE = 'uploads'
+# e.g. {'projects.ProjectProposal.file': 'default'}
+UPLOAD_FIELD_STORAGES = {}
+# Store each upload once under its SHA-256 (hashed while the request streams in) and share
+# it between field values with reference counts; re-saving an unchanged file uploads nothing
+UPLOAD_DEDUP = True
+FILE_UPLOAD_HANDLERS = [
+    'accounts.upload_handlers.HashingMemoryFileUploadHandler',
+    'accounts.upload_handlers.HashingTemporaryFileUploadHandler',
+]
+# Deferred uploads are staged under MEDIA_ROOT/staging/ and moved to their field's storage
+# on a thread pool, retrying failures after 5s, 10s, 20s, ... (see process_uploads)
+UPLOAD_WORKERS = 2
+UPLOAD_MAX_ATTEMPTS = 6
+UPLOAD_RETRY_BASE_DELAY = 5
+UPLOAD_RETRY_MAX_DELAY = 300
+
+# Images served through {% responsive_image %}; accounts.thumbnails caches resized WebP and
+# JPEG/PNG copies of them under MEDIA_ROOT/thumbnails/ (see generate_thumbnails)
+THUMBNAIL_FIELDS = [
+    'startup.StartupProfile.logo',
+    'startup.Employee.profile_picture',
+    'freelancer.FreelancerProfile.profile_picture',
+    'mentors.MentorProfile.profile_image',
+]
+THUMBNAIL_WIDTHS = (96, 192, 384)
+THUMBNAIL_QUALITY = 80
+# Seconds an image whose derivatives could not be built is served as-is before trying again
+THUMBNAIL_FAILURE_TTL = 300
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
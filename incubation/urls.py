@@ -19,9 +19,11 @@ from django.urls import path , include
 from django.conf.urls.static import static
 from django.conf import settings
 from accounts import views
+from startup.views import operator_analytics
 
 
 urlpatterns = [
+    path('admin/analytics/', operator_analytics, name='operator_analytics'),
     path('admin/', admin.site.urls),
     path('accounts/', include('accounts.urls')),
     path("", views.index, name="index"),
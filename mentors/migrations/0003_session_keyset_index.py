@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentors', '0002_mentorprofile_profile_image'),
+        ('startup', '0003_startupstats_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mentorshipsession',
+            index=models.Index(fields=['mentor', 'session_date', 'id'], name='mentors_session_keyset_idx'),
+        ),
+    ]
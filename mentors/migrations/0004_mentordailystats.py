@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentors', '0003_session_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MentorDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('sessions_booked', models.IntegerField(default=0)),
+                ('sessions_completed', models.IntegerField(default=0)),
+                ('sessions_cancelled', models.IntegerField(default=0)),
+                ('mentor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='mentors.mentorprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('mentor', 'day'), name='mentor_daily_stats_unique_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:29
+
+import accounts.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentors', '0004_mentordailystats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mentorprofile',
+            name='profile_image',
+            field=models.ImageField(blank=True, null=True, storage=accounts.storage.FieldStorage('mentors.MentorProfile.profile_image'), upload_to='mentors/profile_images/'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from accounts.models import CustomUser
+from accounts.storage import FieldStorage
 from startup.models import StartupProfile
 
 class MentorProfile(models.Model):
@@ -7,6 +8,7 @@ class MentorProfile(models.Model):
     expertise_area = models.CharField(max_length=200)
     profile_image = models.ImageField(
         upload_to="mentors/profile_images/",
+        storage=FieldStorage("mentors.MentorProfile.profile_image"),
         blank=True,
         null=True
     )
@@ -45,6 +47,28 @@ class MentorshipSession(models.Model):
     default='REQUESTED'
 )
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a mentor's sessions by date
+            models.Index(fields=['mentor', 'session_date', 'id'], name='mentors_session_keyset_idx'),
+        ]
+
     def __str__(self):
         return f"{self.startup.startup_name} → {self.mentor.user.username} ({self.topic})"
 
+
+class MentorDailyStats(models.Model):
+    """One row per mentor per day of sessions, filled by the rollup_startup_stats command."""
+    mentor = models.ForeignKey(MentorProfile, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    sessions_booked = models.IntegerField(default=0)
+    sessions_completed = models.IntegerField(default=0)
+    sessions_cancelled = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['mentor', 'day'], name='mentor_daily_stats_unique_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.mentor.user.username} @ {self.day}"
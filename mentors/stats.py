@@ -0,0 +1,16 @@
+# mentors/stats.py
+from django.db.models import Count, Q
+
+from .models import MentorshipSession
+
+
+def get_session_counts(mentor_profile):
+    """
+    Count a mentor's sessions by approval_status and status in one aggregate query.
+    Keys look like 'approval_pending' and 'status_scheduled', plus 'total'.
+    """
+    aggregates = {'total': Count('id')}
+    for field, prefix in (('approval_status', 'approval'), ('status', 'status')):
+        for value, _ in MentorshipSession._meta.get_field(field).choices:
+            aggregates[f'{prefix}_{value.lower()}'] = Count('id', filter=Q(**{field: value}))
+    return MentorshipSession.objects.filter(mentor=mentor_profile).aggregate(**aggregates)
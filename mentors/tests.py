@@ -1,3 +1,69 @@
+import datetime
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from startup.models import StartupProfile
+from .models import MentorProfile, MentorshipSession
+from .stats import get_session_counts
+from .views import SESSIONS_PER_PAGE
+
+
+class MentorSessionsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='mentor', password='pass12345', role='MENTOR')
+        cls.mentor = MentorProfile.objects.create(user=cls.user, expertise_area='Growth')
+        now = timezone.now()
+        startups = [
+            StartupProfile.objects.create(
+                user=CustomUser.objects.create_user(username=f's{i}', password='pass12345'),
+                startup_name=f'Startup {i}',
+            )
+            for i in range(3)
+        ]
+        MentorshipSession.objects.bulk_create([
+            MentorshipSession(
+                mentor=cls.mentor, startup=startups[i % 3], topic=f'T{i}',
+                # two sessions share each timestamp to exercise the id tie-breaker
+                session_date=now - datetime.timedelta(days=i // 2),
+                approval_status='PENDING' if i % 2 else 'APPROVED',
+                status='REQUESTED' if i % 2 else 'SCHEDULED',
+            )
+            for i in range(SESSIONS_PER_PAGE + 5)
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_counts_single_query(self):
+        with self.assertNumQueries(1):
+            counts = get_session_counts(self.mentor)
+        self.assertEqual(counts['total'], SESSIONS_PER_PAGE + 5)
+        self.assertEqual(counts['approval_pending'], 15)
+        self.assertEqual(counts['status_scheduled'], 15)
+
+    def test_session_list_pages_without_gaps(self):
+        url = reverse('mentors:mentorship_sessions')
+        first = self.client.get(url)
+        self.assertEqual(len(first.context['sessions']), SESSIONS_PER_PAGE)
+        second = self.client.get(url, {'cursor': first.context['next_cursor']})
+        self.assertIsNone(second.context['next_cursor'])
+        seen = [s.id for s in first.context['sessions']] + [s.id for s in second.context['sessions']]
+        self.assertEqual(sorted(seen), sorted(MentorshipSession.objects.values_list('id', flat=True)))
+
+    def test_query_count_independent_of_rows(self):
+        url = reverse('mentors:mentorship_sessions')
+        self.client.get(url)
+        # session + user + mentor profile + page of sessions (joined) + counts; cached notifications
+        with self.assertNumQueries(5):
+            self.client.get(url)
 
-# Create your tests here.
+    def test_dashboard(self):
+        response = self.client.get(reverse('mentors:dashboard'))
+        self.assertEqual(response.context['active_requests'], 15)
+        self.assertTrue(response.context['has_more_sessions'])
@@ -5,6 +5,19 @@ from django.views import View
 from django.contrib.auth import login
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import HttpResponseForbidden
+from django.utils.functional import SimpleLazyObject
+from accounts.pagination import keyset_page
+from .stats import get_session_counts
+
+DASHBOARD_SESSIONS = 10
+SESSIONS_PER_PAGE = 25
+
+
+def mentor_sessions(mentor_profile):
+    """A mentor's sessions with everything the session tables render joined in."""
+    return MentorshipSession.objects.filter(
+        mentor=mentor_profile
+    ).select_related('startup', 'mentor__user')
 
 class MentorSignupView(View):
     def get(self, request):
@@ -27,23 +40,23 @@ class MentorSignupView(View):
 class MentorDashboardView(LoginRequiredMixin, View):
     def get(self, request):
         mentor_profile = get_object_or_404(
-            MentorProfile,
+            MentorProfile.objects.select_related('user'),
             user=request.user
         )
 
-        sessions = MentorshipSession.objects.filter(
-            mentor=mentor_profile
-        )
-
-        # ✅ Active Requests = sessions not yet acted upon
-        active_requests = sessions.filter(
-            approval_status='PENDING'
-        ).count()
+        # Only read when a {% cache %} fragment is rendered, so a cache hit skips the queries
+        counts = SimpleLazyObject(lambda: get_session_counts(mentor_profile))
+        page = SimpleLazyObject(lambda: keyset_page(
+            mentor_sessions(mentor_profile), 'session_date', per_page=DASHBOARD_SESSIONS
+        ))
 
         context = {
             'mentor_profile': mentor_profile,
-            'sessions': sessions,
-            'active_requests': active_requests,
+            'sessions': SimpleLazyObject(lambda: page[0]),
+            'session_counts': counts,
+            # ✅ Active Requests = sessions not yet acted upon
+            'active_requests': SimpleLazyObject(lambda: counts['approval_pending']),
+            'has_more_sessions': SimpleLazyObject(lambda: page[1] is not None),
         }
 
         return render(
@@ -54,9 +67,17 @@ class MentorDashboardView(LoginRequiredMixin, View):
 
 class MentorshipSessionListView(LoginRequiredMixin, View):
     def get(self, request):
-        mentor_profile = get_object_or_404(MentorProfile, user=request.user)
-        sessions = MentorshipSession.objects.filter(mentor=mentor_profile)
-        return render(request, 'mentorship_sessions.html', {'sessions': sessions , 'mentor_profile': mentor_profile,})
+        mentor_profile = get_object_or_404(MentorProfile.objects.select_related('user'), user=request.user)
+        sessions, next_cursor = keyset_page(
+            mentor_sessions(mentor_profile), 'session_date',
+            cursor=request.GET.get('cursor'), per_page=SESSIONS_PER_PAGE
+        )
+        return render(request, 'mentorship_sessions.html', {
+            'sessions': sessions,
+            'mentor_profile': mentor_profile,
+            'session_counts': get_session_counts(mentor_profile),
+            'next_cursor': next_cursor,
+        })
 
 class MentorshipSessionApproveView(LoginRequiredMixin, View):
     def post(self, request, session_id):
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:02
+
+import datetime
+
+from django.db import migrations, models
+
+
+def backfill_created_at(apps, schema_editor):
+    # Existing projects have no creation time; their start date is the closest record
+    Project = apps.get_model('projects', 'Project')
+    for project in Project.objects.filter(created_at__isnull=True).only('id', 'start_date').iterator():
+        project.created_at = datetime.datetime.combine(
+            project.start_date, datetime.time.min, tzinfo=datetime.timezone.utc
+        )
+        project.save(update_fields=['created_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_projectproposal_rejection_note'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+    ]
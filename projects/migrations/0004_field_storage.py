@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:29
+
+import accounts.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_created_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='requirements_file',
+            field=models.FileField(blank=True, null=True, storage=accounts.storage.FieldStorage('projects.Project.requirements_file'), upload_to='project_requirements/'),
+        ),
+        migrations.AlterField(
+            model_name='projectproposal',
+            name='file',
+            field=models.FileField(storage=accounts.storage.FieldStorage('projects.ProjectProposal.file'), upload_to='proposal_attachments/'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from accounts.storage import FieldStorage
 from startup.models import StartupProfile
 from freelancer.models import FreelancerProfile
 from startup.models import Employee
@@ -7,7 +8,10 @@ class Project(models.Model):
     startup = models.ForeignKey(StartupProfile, on_delete=models.CASCADE, related_name="projects")
     name = models.CharField(max_length=200)
     description = models.TextField()
-    requirements_file = models.FileField(upload_to='project_requirements/', blank=True, null=True)  # Local file storage
+    requirements_file = models.FileField(
+        upload_to='project_requirements/', storage=FieldStorage('projects.Project.requirements_file'),
+        blank=True, null=True,
+    )  # Local file storage
     start_date = models.DateField()
     end_date = models.DateField(blank=True, null=True)
     status = models.CharField(max_length=20, choices=[
@@ -18,6 +22,7 @@ class Project(models.Model):
     
     assigned_to_freelancers = models.BooleanField(default=False)
     employees_assigned = models.ManyToManyField(Employee, blank=True, related_name='projects')
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
 
     def __str__(self):
         return f"{self.name} ({self.startup.startup_name})"
@@ -32,7 +37,7 @@ class ProjectProposal(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="proposals")
     freelancer = models.ForeignKey(FreelancerProfile, on_delete=models.CASCADE, related_name="proposals")
     proposal_text = models.TextField()
-    file = models.FileField(upload_to='proposal_attachments/')
+    file = models.FileField(upload_to='proposal_attachments/', storage=FieldStorage('projects.ProjectProposal.file'))
     expected_timeline = models.CharField(max_length=100, blank=True, null=True)
     expected_payment = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     status = models.CharField(max_length=20, choices=[
@@ -0,0 +1,123 @@
+# startup/analytics.py
+import datetime
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from mentors.models import MentorDailyStats
+from .models import OperatorSnapshot, StartupDailyStats, StartupStats
+
+ANALYTICS_WINDOW_DAYS = 30
+TOP_MENTORS = 10
+
+
+def _ratio(part, whole):
+    return round(part / whole, 4) if whole else 0
+
+
+def _funding_by_industry():
+    rows = (
+        StartupStats.objects.values('startup__industry')
+        .annotate(
+            startups=Count('id'),
+            rounds=Sum(F('funding_requested') + F('funding_approved') + F('funding_rejected')),
+            rounds_approved=Sum('funding_approved'),
+            amount_requested=Sum('funding_amount_requested'),
+            amount_approved=Sum('funding_amount_approved'),
+        )
+    )
+    # Industry is free text: fold case and blanks so "Fintech" and "fintech " share a row
+    industries = {}
+    for row in rows:
+        label = (row.pop('startup__industry') or '').strip() or 'Unspecified'
+        entry = industries.setdefault(label.lower(), {'industry': label, **dict.fromkeys(row, 0)})
+        for key, value in row.items():
+            entry[key] += value or 0
+    for entry in industries.values():
+        entry['approval_rate'] = _ratio(entry['amount_approved'], entry['amount_requested'])
+    return sorted(industries.values(), key=lambda entry: entry['amount_requested'], reverse=True)
+
+
+def _mentor_utilization(since, until):
+    rows = list(
+        MentorDailyStats.objects.filter(day__range=(since, until))
+        .values('mentor', 'mentor__user__username')
+        .annotate(
+            booked=Sum('sessions_booked'),
+            completed=Sum('sessions_completed'),
+            cancelled=Sum('sessions_cancelled'),
+        )
+        .order_by('-booked', 'mentor')
+    )
+    booked = sum(row['booked'] for row in rows)
+    completed = sum(row['completed'] for row in rows)
+    active = sum(1 for row in rows if row['booked'])
+    return {
+        'active': active,
+        'sessions_booked': booked,
+        'sessions_completed': completed,
+        'sessions_cancelled': sum(row['cancelled'] for row in rows),
+        'completion_rate': _ratio(completed, booked),
+        'sessions_per_active_mentor': _ratio(booked, active),
+        'top': [
+            {
+                'mentor': row['mentor__user__username'],
+                'booked': row['booked'],
+                'completed': row['completed'],
+                'cancelled': row['cancelled'],
+            }
+            for row in rows[:TOP_MENTORS]
+        ],
+    }
+
+
+def compute_operator_analytics(window_days=ANALYTICS_WINDOW_DAYS, today=None):
+    """
+    Platform-wide figures for the operator dashboard, read from the
+    StartupStats, StartupDailyStats and MentorDailyStats tables only.
+    """
+    until = today or timezone.localdate()
+    since = until - datetime.timedelta(days=window_days - 1)
+
+    totals = StartupStats.objects.aggregate(
+        startups=Count('id'),
+        projects=Sum(F('projects_planned') + F('projects_ongoing') + F('projects_completed')),
+        pending=Sum('proposals_pending'),
+        approved=Sum('proposals_approved'),
+        rejected=Sum('proposals_rejected'),
+    )
+    totals = {key: value or 0 for key, value in totals.items()}
+    proposals = totals['pending'] + totals['approved'] + totals['rejected']
+    active_startups = (
+        StartupDailyStats.objects.filter(day__range=(since, until))
+        .values('startup').distinct().count()
+    )
+
+    return {
+        'window': {'days': window_days, 'since': since.isoformat(), 'until': until.isoformat()},
+        'startups': {'total': totals['startups'], 'active': active_startups},
+        'funnel': {
+            'projects': totals['projects'],
+            'proposals': proposals,
+            'pending': totals['pending'],
+            'approved': totals['approved'],
+            'rejected': totals['rejected'],
+            'approval_rate': _ratio(totals['approved'], totals['approved'] + totals['rejected']),
+        },
+        'mentors': _mentor_utilization(since, until),
+        'funding_by_industry': _funding_by_industry(),
+    }
+
+
+def refresh_operator_analytics(window_days=ANALYTICS_WINDOW_DAYS):
+    """Recompute the operator analytics and replace the stored snapshot."""
+    data = compute_operator_analytics(window_days)
+    with transaction.atomic():
+        OperatorSnapshot.objects.all().delete()
+        return OperatorSnapshot.objects.create(window_days=window_days, data=data)
+
+
+def get_operator_analytics():
+    """Latest stored snapshot, or None if rollup_startup_stats has not run yet."""
+    return OperatorSnapshot.objects.order_by('-computed_at').first()
@@ -1,6 +1,7 @@
 # startup/helpers.py (or inside views.py if you prefer)
-from funding.models import InvestorProfile,FundingRound
-from accounts.models import Notification
+from funding.models import FundingRound
+from accounts.models import Broadcast
+from accounts.outbox import publish_event
 
 def notify_investors(funding: FundingRound):
     """
@@ -9,20 +10,15 @@ def notify_investors(funding: FundingRound):
     """
     if funding.investor:
         # Notify the selected investor only
-        Notification.objects.create(
-            user=funding.investor.user,
+        publish_event(
+            funding.investor.user_id,
             title="Funding Round Created",
             message=f"{funding.startup.startup_name} created a funding round: {funding.round_name} for ${funding.amount}"
         )
     else:
-        # Notify all investors
-        all_investors = InvestorProfile.objects.all()
-        notifications = [
-            Notification(
-                user=investor.user,
-                title="Funding Round Created",
-                message=f"{funding.startup.startup_name} created a funding round: {funding.round_name} for ${funding.amount}"
-            )
-            for investor in all_investors
-        ]
-        Notification.objects.bulk_create(notifications)
+        # Notify all investors with a single broadcast row
+        Broadcast.objects.create(
+            role='INVESTOR',
+            title="Funding Round Created",
+            message=f"{funding.startup.startup_name} created a funding round: {funding.round_name} for ${funding.amount}"
+        )
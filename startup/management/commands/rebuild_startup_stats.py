@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from startup.stats import rebuild_startup_stats
+
+
+class Command(BaseCommand):
+    help = "Recount StartupStats from the source tables and fix any drifted rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('startup_ids', nargs='*', type=int, help="Only rebuild these startups.")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        fixed = rebuild_startup_stats(options['startup_ids'] or None, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {fixed} startup stats row(s)."))
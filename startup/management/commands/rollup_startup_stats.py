@@ -0,0 +1,39 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from startup.analytics import ANALYTICS_WINDOW_DAYS, refresh_operator_analytics
+from startup.rollups import run_rollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the daily StartupDailyStats and MentorDailyStats rollups incrementally, "
+        "then refresh the operator analytics snapshot. "
+        "Each window is replaced atomically, so the command can be re-run safely."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="First day to (re)compute, YYYY-MM-DD. Defaults to resuming.")
+        parser.add_argument('--until', help="Last day to compute, YYYY-MM-DD. Defaults to today.")
+        parser.add_argument('--lookback-days', type=int, default=3,
+                            help="Days before the last rollup to recompute when resuming.")
+        parser.add_argument('--window-days', type=int, default=31,
+                            help="Days committed per transaction.")
+        parser.add_argument('--analytics-days', type=int, default=ANALYTICS_WINDOW_DAYS,
+                            help="Trailing days covered by the operator analytics snapshot.")
+
+    def handle(self, *args, **options):
+        try:
+            since = datetime.date.fromisoformat(options['since']) if options['since'] else None
+            until = datetime.date.fromisoformat(options['until']) if options['until'] else None
+        except ValueError as e:
+            raise CommandError(e)
+
+        windows = 0
+        for start, end, touched in run_rollup(since, until, options['lookback_days'], options['window_days']):
+            windows += 1
+            self.stdout.write(f"Rolled up {start} → {end} ({len(touched)} startups)")
+        snapshot = refresh_operator_analytics(options['analytics_days'])
+        self.stdout.write(f"Refreshed operator analytics ({snapshot.window_days} days)")
+        self.stdout.write(self.style.SUCCESS(f"Done: {windows} window(s)."))
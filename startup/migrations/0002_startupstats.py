@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startup', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StartupStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('projects_planned', models.IntegerField(default=0)),
+                ('projects_ongoing', models.IntegerField(default=0)),
+                ('projects_completed', models.IntegerField(default=0)),
+                ('proposals_pending', models.IntegerField(default=0)),
+                ('proposals_approved', models.IntegerField(default=0)),
+                ('proposals_rejected', models.IntegerField(default=0)),
+                ('funding_requested', models.IntegerField(default=0)),
+                ('funding_approved', models.IntegerField(default=0)),
+                ('funding_rejected', models.IntegerField(default=0)),
+                ('sessions_requested', models.IntegerField(default=0)),
+                ('sessions_scheduled', models.IntegerField(default=0)),
+                ('sessions_completed', models.IntegerField(default=0)),
+                ('sessions_cancelled', models.IntegerField(default=0)),
+                ('employees_count', models.IntegerField(default=0)),
+                ('unread_notifications', models.IntegerField(default=0)),
+                ('startup', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='startup.startupprofile')),
+            ],
+        ),
+    ]
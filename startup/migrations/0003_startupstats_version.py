@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startup', '0002_startupstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='startupstats',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startup', '0003_startupstats_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StartupDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('projects_created', models.IntegerField(default=0)),
+                ('proposals_received', models.IntegerField(default=0)),
+                ('funding_requested', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('sessions_completed', models.IntegerField(default=0)),
+                ('startup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='startup.startupprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('startup', 'day'), name='startup_daily_stats_unique_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:45
+
+import django.core.serializers.json
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def backfill_funding_amounts(apps, schema_editor):
+    # Existing counter rows start at zero; fill the new totals from the rounds they count
+    FundingRound = apps.get_model('funding', 'FundingRound')
+    StartupStats = apps.get_model('startup', 'StartupStats')
+    totals = FundingRound.objects.values('startup').annotate(
+        requested=Sum('amount'), approved=Sum('amount', filter=Q(status='APPROVED')),
+    )
+    for row in totals.iterator():
+        StartupStats.objects.filter(startup=row['startup']).update(
+            funding_amount_requested=row['requested'] or 0,
+            funding_amount_approved=row['approved'] or 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startup', '0004_startupdailystats'),
+        ('funding', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OperatorSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+                ('window_days', models.PositiveIntegerField()),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'get_latest_by': 'computed_at',
+            },
+        ),
+        migrations.AddField(
+            model_name='startupstats',
+            name='funding_amount_approved',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=17),
+        ),
+        migrations.AddField(
+            model_name='startupstats',
+            name='funding_amount_requested',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=17),
+        ),
+        migrations.RunPython(backfill_funding_amounts, migrations.RunPython.noop),
+    ]
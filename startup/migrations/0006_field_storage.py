@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:29
+
+import accounts.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('startup', '0005_operator_analytics'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, storage=accounts.storage.FieldStorage('startup.Employee.profile_picture'), upload_to='employee_profiles/'),
+        ),
+        migrations.AlterField(
+            model_name='startupprofile',
+            name='logo',
+            field=models.ImageField(blank=True, null=True, storage=accounts.storage.FieldStorage('startup.StartupProfile.logo'), upload_to='startup_logos/'),
+        ),
+    ]
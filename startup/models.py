@@ -1,5 +1,7 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from accounts.models import CustomUser
+from accounts.storage import FieldStorage
 
 class StartupProfile(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name="startup_profile")
@@ -8,7 +10,9 @@ class StartupProfile(models.Model):
     website = models.URLField(blank=True, null=True)
     founded_date = models.DateField(blank=True, null=True)
     industry = models.CharField(max_length=100, blank=True, null=True)
-    logo = models.ImageField(upload_to='startup_logos/', blank=True, null=True)  # changed to ImageField
+    logo = models.ImageField(
+        upload_to='startup_logos/', storage=FieldStorage('startup.StartupProfile.logo'), blank=True, null=True
+    )  # changed to ImageField
 
     def __str__(self):
         return self.startup_name
@@ -20,7 +24,9 @@ class Employee(models.Model):
     role = models.CharField(max_length=100, blank=True, null=True)
     email = models.EmailField(blank=True, null=True)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
-    profile_picture = models.ImageField(upload_to='employee_profiles/', blank=True, null=True)  # changed to ImageField
+    profile_picture = models.ImageField(
+        upload_to='employee_profiles/', storage=FieldStorage('startup.Employee.profile_picture'), blank=True, null=True
+    )  # changed to ImageField
     linkedin_profile = models.URLField(blank=True, null=True)
     github_profile = models.URLField(blank=True, null=True)
     skills = models.TextField(blank=True, null=True)
@@ -31,3 +37,67 @@ class Employee(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.startup.startup_name})"
+
+
+class StartupStats(models.Model):
+    """Running dashboard counters, kept current by startup/signals.py."""
+    startup = models.OneToOneField(StartupProfile, on_delete=models.CASCADE, related_name='stats')
+
+    projects_planned = models.IntegerField(default=0)
+    projects_ongoing = models.IntegerField(default=0)
+    projects_completed = models.IntegerField(default=0)
+
+    proposals_pending = models.IntegerField(default=0)
+    proposals_approved = models.IntegerField(default=0)
+    proposals_rejected = models.IntegerField(default=0)
+
+    funding_requested = models.IntegerField(default=0)
+    funding_approved = models.IntegerField(default=0)
+    funding_rejected = models.IntegerField(default=0)
+    funding_amount_requested = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+    funding_amount_approved = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+
+    sessions_requested = models.IntegerField(default=0)
+    sessions_scheduled = models.IntegerField(default=0)
+    sessions_completed = models.IntegerField(default=0)
+    sessions_cancelled = models.IntegerField(default=0)
+
+    employees_count = models.IntegerField(default=0)
+    unread_notifications = models.IntegerField(default=0)
+
+    # Bumped on every write to a counted row; used as the dashboard_data ETag
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Stats for {self.startup.startup_name}"
+
+
+class StartupDailyStats(models.Model):
+    """One row per startup per day, filled by the rollup_startup_stats command."""
+    startup = models.ForeignKey(StartupProfile, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    projects_created = models.IntegerField(default=0)
+    proposals_received = models.IntegerField(default=0)
+    funding_requested = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    sessions_completed = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['startup', 'day'], name='startup_daily_stats_unique_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.startup.startup_name} @ {self.day}"
+
+
+class OperatorSnapshot(models.Model):
+    """Platform-wide analytics computed from the stats tables by rollup_startup_stats."""
+    computed_at = models.DateTimeField(auto_now_add=True)
+    window_days = models.PositiveIntegerField()
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        get_latest_by = 'computed_at'
+
+    def __str__(self):
+        return f"Operator analytics @ {self.computed_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,160 @@
+# startup/rollups.py
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from projects.models import Project, ProjectProposal
+from funding.models import FundingRound
+from mentors.models import MentorDailyStats, MentorshipSession
+from .models import StartupDailyStats, StartupStats
+
+TREND_FIELDS = ['projects_created', 'proposals_received', 'funding_requested', 'sessions_completed']
+
+
+def _sources():
+    """(rollup field, queryset, lookup to StartupProfile, day lookup, day expression, aggregate)"""
+    return [
+        ('projects_created', Project.objects.all(), 'startup',
+         'created_at__date', TruncDate('created_at'), Count('id')),
+        ('proposals_received', ProjectProposal.objects.all(), 'project__startup',
+         'submitted_at__date', TruncDate('submitted_at'), Count('id')),
+        ('funding_requested', FundingRound.objects.all(), 'startup',
+         'date', F('date'), Sum('amount')),
+        ('sessions_completed', MentorshipSession.objects.filter(status='COMPLETED'), 'startup',
+         'session_date__date', TruncDate('session_date'), Count('id')),
+    ]
+
+
+def _mentor_rows(start, end):
+    """MentorDailyStats rows for sessions dated between `start` and `end`."""
+    grouped = (
+        MentorshipSession.objects.filter(session_date__date__range=(start, end))
+        .annotate(rollup_day=TruncDate('session_date'))
+        .values('mentor', 'rollup_day')
+        .annotate(
+            sessions_booked=Count('id', filter=~Q(status='CANCELLED')),
+            sessions_completed=Count('id', filter=Q(status='COMPLETED')),
+            sessions_cancelled=Count('id', filter=Q(status='CANCELLED')),
+        )
+    )
+    return [
+        MentorDailyStats(mentor_id=row.pop('mentor'), day=row.pop('rollup_day'), **row)
+        for row in grouped
+    ]
+
+
+def rollup_days(start, end):
+    """
+    Recompute the daily startup and mentor rows between `start` and `end` inclusive.
+    The range is replaced atomically, so re-running it after a crash is safe.
+    Returns the ids of startups whose rows were written or removed.
+    """
+    mentor_rows = _mentor_rows(start, end)
+    rows = defaultdict(dict)
+    for field, queryset, startup_lookup, day_lookup, day_expr, aggregate in _sources():
+        grouped = (
+            queryset.filter(**{f'{day_lookup}__range': (start, end)})
+            .annotate(rollup_day=day_expr)
+            .values(startup_lookup, 'rollup_day')
+            .annotate(value=aggregate)
+        )
+        for row in grouped:
+            rows[(row[startup_lookup], row['rollup_day'])][field] = row['value'] or 0
+
+    with transaction.atomic():
+        existing = StartupDailyStats.objects.filter(day__range=(start, end))
+        touched = set(existing.values_list('startup_id', flat=True))
+        existing.delete()
+        StartupDailyStats.objects.bulk_create([
+            StartupDailyStats(startup_id=startup_id, day=day, **values)
+            for (startup_id, day), values in rows.items()
+        ])
+        touched.update(startup_id for startup_id, _ in rows)
+        MentorDailyStats.objects.filter(day__range=(start, end)).delete()
+        MentorDailyStats.objects.bulk_create(mentor_rows)
+        # Trend data is part of the dashboard_data payload, so move its ETag
+        StartupStats.objects.filter(startup_id__in=touched).update(version=F('version') + 1)
+    return touched
+
+
+def _earliest_source_day():
+    candidates = [
+        Project.objects.aggregate(first=Min('created_at'))['first'],
+        ProjectProposal.objects.aggregate(first=Min('submitted_at'))['first'],
+        FundingRound.objects.aggregate(first=Min('date'))['first'],
+        MentorshipSession.objects.aggregate(first=Min('session_date'))['first'],
+    ]
+    days = [
+        timezone.localdate(value) if isinstance(value, datetime.datetime) else value
+        for value in candidates if value
+    ]
+    return min(days) if days else None
+
+
+def run_rollup(since=None, until=None, lookback_days=3, window_days=31):
+    """
+    Bring the daily rollup up to `until` (default today).
+    Without `since`, resumes from the last rolled-up day minus `lookback_days`
+    so late status changes are picked up. Work is committed one window at a
+    time; yields (start, end, touched_startup_ids) per window.
+    """
+    until = until or timezone.localdate()
+    if since is None:
+        last = StartupDailyStats.objects.aggregate(last=Max('day'))['last']
+        since = last - datetime.timedelta(days=lookback_days) if last else _earliest_source_day()
+    if since is None:
+        return
+
+    start = since
+    while start <= until:
+        end = min(start + datetime.timedelta(days=window_days - 1), until)
+        yield start, end, rollup_days(start, end)
+        start = end + datetime.timedelta(days=1)
+
+
+# -----------------------------
+# Reading trend series
+# -----------------------------
+def _month_start(day, months_back=0):
+    month_index = day.year * 12 + day.month - 1 - months_back
+    return datetime.date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def get_trend_series(profile, weeks=12, months=12, today=None):
+    """
+    Weekly and monthly totals for the dashboard charts, read from the rollup
+    table in a single query. Empty periods are returned as zeros.
+    """
+    today = today or timezone.localdate()
+    this_week = today - datetime.timedelta(days=today.weekday())
+    week_starts = [this_week - datetime.timedelta(weeks=n) for n in reversed(range(weeks))]
+    month_starts = [_month_start(today, n) for n in reversed(range(months))]
+
+    weekly = {start: dict.fromkeys(TREND_FIELDS, 0) for start in week_starts}
+    monthly = {start: dict.fromkeys(TREND_FIELDS, 0) for start in month_starts}
+
+    rows = StartupDailyStats.objects.filter(
+        startup=profile, day__gte=min(week_starts[0], month_starts[0]), day__lte=today
+    ).values('day', *TREND_FIELDS)
+    for row in rows:
+        day = row['day']
+        for bucket, key in ((weekly, day - datetime.timedelta(days=day.weekday())), (monthly, _month_start(day))):
+            if key in bucket:
+                for field in TREND_FIELDS:
+                    bucket[key][field] += row[field]
+
+    def series(buckets):
+        return [
+            {
+                'period': start.isoformat(),
+                **{field: float(v) if isinstance(v, Decimal) else v for field, v in values.items()},
+            }
+            for start, values in buckets.items()
+        ]
+
+    return {'weekly': series(weekly), 'monthly': series(monthly)}
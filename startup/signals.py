@@ -0,0 +1,248 @@
+# startup/signals.py
+from django.db.models import DEFERRED, F, Q
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from accounts.fragments import bump_widgets
+from accounts.push import publish_to_users
+from accounts.models import CustomUser, Notification
+from accounts.notifications import notifications_marked_read
+from projects.models import Project, ProjectProposal, ProjectAssignment
+from freelancer.models import FreelancerProfile
+from funding.models import FundingRound
+from mentors.models import MentorProfile, MentorshipSession
+from .models import StartupProfile, StartupStats, Employee
+from .stats import status_field
+
+STATUS_PREFIXES = {
+    Project: 'projects',
+    ProjectProposal: 'proposals',
+    FundingRound: 'funding',
+    MentorshipSession: 'sessions',
+}
+
+# Snapshot attribute set by the post_init receivers -> the field it remembers
+SNAPSHOTS = {'_counted_status': 'status', '_counted_amount': 'amount', '_counted_read': 'read'}
+
+# Owner keys the post_save/post_delete receivers below read from each model
+OWNER_FIELDS = {
+    Project: ['startup_id'],
+    ProjectProposal: ['project_id', 'freelancer_id'],
+    FundingRound: ['startup_id'],
+    MentorshipSession: ['startup_id', 'mentor_id'],
+    Employee: ['startup_id'],
+    ProjectAssignment: ['freelancer_id'],
+    Notification: ['user_id'],
+}
+
+
+def _stats_for(instance):
+    """StartupStats queryset for the startup that owns `instance`."""
+    if isinstance(instance, ProjectProposal):
+        return StartupStats.objects.filter(startup__projects=instance.project_id)
+    if isinstance(instance, Notification):
+        return StartupStats.objects.filter(startup__user=instance.user_id)
+    return StartupStats.objects.filter(startup=instance.startup_id)
+
+
+def _bump(instance, deltas, touch=False):
+    """
+    Apply {field: delta} to the owning StartupStats row in one atomic UPDATE.
+    With touch=True the version stamp is bumped as well, even if no counter moved.
+    """
+    changes = {field: F(field) + delta for field, delta in deltas.items() if field and delta}
+    if touch:
+        changes['version'] = F('version') + 1
+    if changes:
+        _stats_for(instance).update(**changes)
+
+
+@receiver(post_save, sender=StartupProfile)
+def create_startup_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        StartupStats.objects.get_or_create(startup=instance)
+
+
+def load_deferred_snapshots(sender, instance, raw=False, **kwargs):
+    """
+    The post_init receivers read from __dict__, so a field left out by
+    only()/defer() is remembered as DEFERRED, and the owner keys may be
+    deferred too. Before the row is written or deleted, fetch what is missing
+    in one query; once it is deleted, nothing could be loaded any more.
+    """
+    if raw:
+        return
+    snapshots = {attr: field for attr, field in SNAPSHOTS.items() if getattr(instance, attr, None) is DEFERRED}
+    owners = [attname for attname in OWNER_FIELDS[sender] if attname not in instance.__dict__]
+    if not snapshots and not owners:
+        return
+    stored = sender._base_manager.filter(pk=instance.pk).values(*snapshots.values(), *owners).first() or {}
+    for attr, field in snapshots.items():
+        setattr(instance, attr, stored.get(field))
+    for attname in owners:
+        setattr(instance, attname, stored.get(attname))
+
+
+# -----------------------------
+# Status counters
+# -----------------------------
+def remember_status(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields are not fetched; load_deferred_snapshots() does it on write
+    instance._counted_status = instance.__dict__.get('status', DEFERRED)
+
+
+def count_status_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    prefix = STATUS_PREFIXES[sender]
+    old = None if created else getattr(instance, '_counted_status', None)
+    new = instance.status
+    deltas = {}
+    if old != new:
+        deltas = {status_field(prefix, old): -1, status_field(prefix, new): 1}
+    if sender is FundingRound:
+        old_amount = 0 if created else getattr(instance, '_counted_amount', None)
+        deltas.update(_funding_amount_deltas(old, old_amount, new, instance.amount))
+        instance._counted_amount = instance.amount
+    _bump(instance, deltas, touch=True)
+    if old != new and not created:
+        _push_status_change(instance)
+    instance._counted_status = new
+
+
+def count_status_delete(sender, instance, **kwargs):
+    deltas = {status_field(STATUS_PREFIXES[sender], instance._counted_status): -1}
+    if sender is FundingRound:
+        deltas.update(_funding_amount_deltas(instance._counted_status, instance._counted_amount, None, 0))
+    _bump(instance, deltas, touch=True)
+
+
+for model in OWNER_FIELDS:
+    pre_save.connect(load_deferred_snapshots, sender=model)
+    pre_delete.connect(load_deferred_snapshots, sender=model)
+
+for model in STATUS_PREFIXES:
+    post_init.connect(remember_status, sender=model)
+    post_save.connect(count_status_save, sender=model)
+    post_delete.connect(count_status_delete, sender=model)
+
+
+# -----------------------------
+# Live push of status changes
+# -----------------------------
+def _push_status_change(instance):
+    if isinstance(instance, ProjectProposal):
+        users = FreelancerProfile.objects.filter(pk=instance.freelancer_id).values_list('user_id', flat=True)
+        publish_to_users(users, 'proposal', {
+            'id': instance.pk, 'project': instance.project_id, 'status': instance.status,
+        })
+    elif isinstance(instance, MentorshipSession):
+        publish_to_users(_fragment_users(instance), 'session', {
+            'id': instance.pk, 'topic': instance.topic, 'status': instance.status,
+            'session_date': instance.session_date,
+        })
+
+
+# -----------------------------
+# Funding amounts
+# -----------------------------
+@receiver(post_init, sender=FundingRound)
+def remember_amount(sender, instance, **kwargs):
+    instance._counted_amount = instance.__dict__.get('amount', DEFERRED)
+
+
+def _funding_amount_deltas(old_status, old_amount, new_status, new_amount):
+    """Changes to the requested/approved totals when a round moves from (old) to (new)."""
+    old_amount, new_amount = old_amount or 0, new_amount or 0
+    approved_before = old_amount if old_status == 'APPROVED' else 0
+    approved_after = new_amount if new_status == 'APPROVED' else 0
+    return {
+        'funding_amount_requested': new_amount - old_amount,
+        'funding_amount_approved': approved_after - approved_before,
+    }
+
+
+# -----------------------------
+# Employees
+# -----------------------------
+@receiver(post_save, sender=Employee)
+def count_employee_save(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _bump(instance, {'employees_count': 1})
+
+
+@receiver(post_delete, sender=Employee)
+def count_employee_delete(sender, instance, **kwargs):
+    _bump(instance, {'employees_count': -1})
+
+
+# -----------------------------
+# Unread notifications
+# -----------------------------
+@receiver(post_init, sender=Notification)
+def remember_read(sender, instance, **kwargs):
+    instance._counted_read = instance.__dict__.get('read', DEFERRED)
+
+
+@receiver(post_save, sender=Notification)
+def count_notification_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    was_unread = False if created else instance._counted_read is False
+    is_unread = not instance.read
+    if was_unread != is_unread:
+        _bump(instance, {'unread_notifications': 1 if is_unread else -1})
+    instance._counted_read = instance.read
+
+
+@receiver(post_delete, sender=Notification)
+def count_notification_delete(sender, instance, **kwargs):
+    # The row is gone, so a deferred `read` can only come from the snapshot
+    if instance._counted_read is False:
+        _bump(instance, {'unread_notifications': -1})
+
+
+@receiver(notifications_marked_read)
+def count_notifications_marked_read(sender, user_id, count, **kwargs):
+    StartupStats.objects.filter(startup__user=user_id).update(unread_notifications=F('unread_notifications') - count)
+
+
+# -----------------------------
+# Dashboard fragment caches
+# -----------------------------
+def _fragment_users(instance):
+    """Users whose dashboard widgets show `instance`."""
+    if isinstance(instance, Project):
+        users = Q(startup_profile=instance.startup_id) | Q(freelancer_profile__projectassignment__project=instance.pk)
+    elif isinstance(instance, ProjectProposal):
+        users = Q(startup_profile__projects=instance.project_id) | Q(freelancer_profile=instance.freelancer_id)
+    elif isinstance(instance, MentorshipSession):
+        users = Q(startup_profile=instance.startup_id) | Q(mentor_profile=instance.mentor_id)
+    else:
+        users = Q(freelancer_profile=instance.freelancer_id)
+    return CustomUser.objects.filter(users).values_list('id', flat=True).distinct()
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=ProjectProposal)
+@receiver(post_delete, sender=ProjectProposal)
+@receiver(post_save, sender=ProjectAssignment)
+@receiver(post_delete, sender=ProjectAssignment)
+def bump_dashboard_stats(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_widgets(['stats'], _fragment_users(instance))
+
+
+@receiver(post_save, sender=MentorshipSession)
+@receiver(post_delete, sender=MentorshipSession)
+def bump_session_widgets(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_widgets(['stats', 'sessions'], _fragment_users(instance))
+
+
+@receiver(post_save, sender=MentorProfile)
+def bump_mentor_profile_stats(sender, instance, raw=False, **kwargs):
+    # experience_years is shown among the mentor stat cards
+    if not raw:
+        bump_widgets(['stats'], [instance.user_id])
@@ -0,0 +1,172 @@
+# startup/stats.py
+from django.db.models import Count, Q, Sum
+
+from accounts.models import Notification
+from projects.models import Project, ProjectProposal
+from funding.models import FundingRound
+from mentors.models import MentorshipSession
+from .models import StartupProfile, StartupStats, Employee
+
+# Status counters kept on StartupStats: prefix -> (model, lookup to StartupProfile)
+STATUS_COUNTERS = {
+    'projects': (Project, 'startup'),
+    'proposals': (ProjectProposal, 'project__startup'),
+    'funding': (FundingRound, 'startup'),
+    'sessions': (MentorshipSession, 'startup'),
+}
+
+COUNTER_FIELDS = [
+    f.name for f in StartupStats._meta.get_fields()
+    if f.concrete and not f.is_relation and not f.primary_key and f.name != 'version'
+]
+
+
+def status_field(prefix, status):
+    """Name of the StartupStats column counting `status`, or None if untracked."""
+    if not status:
+        return None
+    name = f"{prefix}_{status.lower()}"
+    return name if name in COUNTER_FIELDS else None
+
+
+def aggregate_startup_counts(startup_ids=None):
+    """
+    Count everything StartupStats holds straight from the source tables.
+    Runs one grouped query per table (two for funding) and returns {startup_id: {field: count}}.
+    """
+    counts = {}
+
+    def collect(queryset, key):
+        for row in queryset:
+            startup_id = row.pop(key)
+            counts.setdefault(startup_id, {}).update(row)
+
+    for prefix, (model, lookup) in STATUS_COUNTERS.items():
+        qs = model.objects.all()
+        if startup_ids is not None:
+            qs = qs.filter(**{f'{lookup}__in': startup_ids})
+        statuses = [value for value, _ in model._meta.get_field('status').choices]
+        collect(
+            qs.values(lookup).annotate(**{
+                status_field(prefix, status): Count('id', filter=Q(status=status))
+                for status in statuses
+            }),
+            lookup,
+        )
+
+    funding = FundingRound.objects.all()
+    if startup_ids is not None:
+        funding = funding.filter(startup__in=startup_ids)
+    collect(
+        funding.values('startup').annotate(
+            funding_amount_requested=Sum('amount'),
+            funding_amount_approved=Sum('amount', filter=Q(status='APPROVED')),
+        ),
+        'startup',
+    )
+
+    employees = Employee.objects.all()
+    notifications = Notification.objects.filter(read=False, user__startup_profile__isnull=False)
+    if startup_ids is not None:
+        employees = employees.filter(startup__in=startup_ids)
+        notifications = notifications.filter(user__startup_profile__in=startup_ids)
+    collect(employees.values('startup').annotate(employees_count=Count('id')), 'startup')
+    collect(
+        notifications.values('user__startup_profile').annotate(unread_notifications=Count('id')),
+        'user__startup_profile',
+    )
+    return counts
+
+
+def rebuild_startup_stats(startup_ids=None, batch_size=500):
+    """
+    Reconcile StartupStats rows with the source tables.
+    Missing rows are created and drifted rows rewritten; returns the number
+    of rows that were created or changed.
+    """
+    profiles = StartupProfile.objects.all()
+    if startup_ids is not None:
+        profiles = profiles.filter(id__in=startup_ids)
+    profile_ids = list(profiles.values_list('id', flat=True))
+
+    counts = aggregate_startup_counts(startup_ids)
+    existing = {s.startup_id: s for s in StartupStats.objects.filter(startup_id__in=profile_ids)}
+
+    to_create, to_update = [], []
+    for startup_id in profile_ids:
+        expected = {field: counts.get(startup_id, {}).get(field) or 0 for field in COUNTER_FIELDS}
+        stats = existing.get(startup_id)
+        if stats is None:
+            to_create.append(StartupStats(startup_id=startup_id, **expected))
+        elif any(getattr(stats, field) != value for field, value in expected.items()):
+            for field, value in expected.items():
+                setattr(stats, field, value)
+            stats.version += 1
+            to_update.append(stats)
+
+    StartupStats.objects.bulk_create(to_create, batch_size=batch_size, ignore_conflicts=True)
+    StartupStats.objects.bulk_update(to_update, COUNTER_FIELDS + ['version'], batch_size=batch_size)
+    return len(to_create) + len(to_update)
+
+
+def get_stats_version(user):
+    """Current (startup_id, version) stamp for a startup user, or None if no stats row exists."""
+    return (
+        StartupStats.objects.filter(startup__user=user)
+        .values_list('startup_id', 'version')
+        .first()
+    )
+
+
+def get_dashboard_stats(profile):
+    """
+    Read every number shown on the startup dashboard from the StartupStats row.
+    The row is built on the fly for profiles that predate it.
+    """
+    stats = StartupStats.objects.filter(startup=profile).first()
+    if stats is None:
+        rebuild_startup_stats([profile.id])
+        stats = StartupStats.objects.get(startup=profile)
+
+    return {
+        'projects_count': stats.projects_planned + stats.projects_ongoing + stats.projects_completed,
+        'projects_planned': stats.projects_planned,
+        'projects_open': stats.projects_planned,
+        'projects_in_progress': stats.projects_ongoing,
+        'projects_completed': stats.projects_completed,
+        'employees_count': stats.employees_count,
+        'proposals_count': stats.proposals_pending + stats.proposals_approved + stats.proposals_rejected,
+        'proposals_approved': stats.proposals_approved,
+        'proposals_rejected': stats.proposals_rejected,
+        'funding_count': stats.funding_requested + stats.funding_approved + stats.funding_rejected,
+        'funding_approved': stats.funding_approved,
+        'funding_rejected': stats.funding_rejected,
+        'mentorship_count': stats.sessions_scheduled,
+        'mentorship_completed': stats.sessions_completed,
+        'notifications_count': stats.unread_notifications,
+    }
+
+
+def dashboard_payload(stats):
+    """Shape the flat stats dict into the JSON served by dashboard_data."""
+    return {
+        'projects': {
+            'planned': stats['projects_planned'],
+            'ongoing': stats['projects_in_progress'],
+            'completed': stats['projects_completed'],
+        },
+        'proposals': {
+            'submitted': stats['proposals_count'],
+            'approved': stats['proposals_approved'],
+            'rejected': stats['proposals_rejected'],
+        },
+        'funding': {
+            'requested': stats['funding_count'],
+            'approved': stats['funding_approved'],
+            'rejected': stats['funding_rejected'],
+        },
+        'mentorship': {
+            'scheduled': stats['mentorship_count'],
+            'completed': stats['mentorship_completed'],
+        }
+    }
@@ -1,3 +1,316 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Broadcast, CustomUser, Notification
+from accounts.notifications import get_notification_summary, mark_notifications_read
+from freelancer.models import FreelancerProfile
+from funding.models import FundingRound
+from mentors.models import MentorProfile, MentorshipSession
+from projects.models import Project, ProjectProposal
+from .models import StartupProfile, StartupStats, StartupDailyStats, Employee, OperatorSnapshot
+from .stats import get_dashboard_stats, aggregate_startup_counts, rebuild_startup_stats
+
+
+class StartupDataTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='acme', password='pass12345', role='STARTUP')
+        cls.profile = StartupProfile.objects.create(user=cls.user, startup_name='Acme')
+        Employee.objects.create(startup=cls.profile, name='Ann')
+
+        freelancer_user = CustomUser.objects.create_user(username='fl', password='pass12345', role='FREELANCER')
+        cls.freelancer = freelancer = FreelancerProfile.objects.create(user=freelancer_user, full_name='Free Lancer')
+        mentor_user = CustomUser.objects.create_user(username='mentor', password='pass12345', role='MENTOR')
+        cls.mentor = mentor = MentorProfile.objects.create(user=mentor_user, expertise_area='Growth')
+
+        today = datetime.date.today()
+        for status in ['PLANNED', 'PLANNED', 'ONGOING', 'COMPLETED']:
+            project = Project.objects.create(
+                startup=cls.profile, name=f'P {status}', description='-', start_date=today, status=status
+            )
+        for status in ['PENDING', 'APPROVED', 'REJECTED', 'REJECTED']:
+            ProjectProposal.objects.create(
+                project=project, freelancer=freelancer, proposal_text='-', file='proposal.pdf', status=status
+            )
+        for status in ['REQUESTED', 'APPROVED']:
+            FundingRound.objects.create(startup=cls.profile, round_name='Seed', amount=1000, status=status)
+        for status in ['SCHEDULED', 'SCHEDULED', 'COMPLETED', 'CANCELLED']:
+            MentorshipSession.objects.create(
+                mentor=mentor, startup=cls.profile, topic='-', session_date=timezone.now(), status=status
+            )
+
+    def setUp(self):
+        cache.clear()
+
+
+
+class DashboardStatsTests(StartupDataTestCase):
+    def test_stats_values(self):
+        stats = get_dashboard_stats(self.profile)
+        self.assertEqual(stats['projects_count'], 4)
+        self.assertEqual(stats['projects_planned'], 2)
+        self.assertEqual(stats['projects_in_progress'], 1)
+        self.assertEqual(stats['projects_completed'], 1)
+        self.assertEqual(stats['proposals_count'], 4)
+        self.assertEqual(stats['proposals_approved'], 1)
+        self.assertEqual(stats['proposals_rejected'], 2)
+        self.assertEqual(stats['funding_count'], 2)
+        self.assertEqual(stats['funding_approved'], 1)
+        self.assertEqual(stats['mentorship_count'], 2)
+        self.assertEqual(stats['mentorship_completed'], 1)
+        self.assertEqual(stats['employees_count'], 1)
+
+    def test_stats_query_count(self):
+        with self.assertNumQueries(1):
+            get_dashboard_stats(self.profile)
+
+    def test_aggregate_query_count(self):
+        # One grouped query per table (two for funding: counts and amounts), plus employees and notifications
+        with self.assertNumQueries(7):
+            aggregate_startup_counts([self.profile.id])
+
+    def test_dashboard_data_query_count(self):
+        self.client.force_login(self.user)
+        url = reverse('startup:dashboard_data')
+        self.client.get(url)
+        # session + user + ETag version stamp + startup profile + stats row + trend rollup
+        with self.assertNumQueries(6):
+            response = self.client.get(url)
+        self.assertEqual(response.json()['projects']['planned'], 2)
+        self.assertEqual(response.json()['proposals']['rejected'], 2)
+
+    def test_dashboard_query_count(self):
+        self.client.force_login(self.user)
+        url = reverse('startup:startup_dashboard')
+        self.client.get(url)
+        self.assertEqual(self.client.get(url).context['stats']['projects_planned'], 2)
+        # session + user + startup profile; the stats row is skipped on a fragment hit
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+
+class StartupStatsSignalTests(StartupDataTestCase):
+    def stats(self):
+        return StartupStats.objects.get(startup=self.profile)
+
+    def test_counters_match_source_tables(self):
+        self.assertEqual(rebuild_startup_stats(), 0)
+
+    def test_status_change_moves_counter(self):
+        project = Project.objects.filter(startup=self.profile, status='PLANNED').first()
+        project.status = 'COMPLETED'
+        project.save()
+        stats = self.stats()
+        self.assertEqual(stats.projects_planned, 1)
+        self.assertEqual(stats.projects_completed, 2)
+
+    def test_delete_decrements(self):
+        Project.objects.get(startup=self.profile, status='COMPLETED').delete()
+        stats = self.stats()
+        self.assertEqual(stats.projects_completed, 0)
+        self.assertEqual(stats.proposals_pending, 0)
+        self.assertEqual(stats.proposals_rejected, 0)
+        Employee.objects.filter(startup=self.profile).delete()
+        self.assertEqual(self.stats().employees_count, 0)
+
+    def test_funding_amounts(self):
+        funding = FundingRound.objects.get(startup=self.profile, status='REQUESTED')
+        funding.status = 'APPROVED'
+        funding.amount = 2500
+        funding.save()
+        stats = self.stats()
+        self.assertEqual(stats.funding_amount_requested, 3500)
+        self.assertEqual(stats.funding_amount_approved, 3500)
+        funding.delete()
+        stats = self.stats()
+        self.assertEqual(stats.funding_amount_requested, 1000)
+        self.assertEqual(stats.funding_amount_approved, 1000)
+        self.assertEqual(rebuild_startup_stats(), 0)
+
+    def test_deferred_fields_are_counted(self):
+        funding = FundingRound.objects.only('id').get(startup=self.profile, status='REQUESTED')
+        funding.status = 'APPROVED'
+        funding.amount = 2500
+        funding.save()
+        ProjectProposal.objects.only('id').filter(status='APPROVED').first().delete()
+        project = Project.objects.defer('status', 'startup').get(startup=self.profile, status='COMPLETED')
+        project.delete()
+        note = Notification.objects.create(user=self.user, title='-', message='-')
+        Notification.objects.only('id').get(pk=note.pk).delete()
+        Employee.objects.only('id').get(startup=self.profile).delete()
+        stats = self.stats()
+        self.assertEqual(stats.funding_amount_approved, 3500)
+        self.assertEqual(stats.projects_completed, 0)
+        self.assertEqual(stats.employees_count, 0)
+        self.assertEqual(rebuild_startup_stats(), 0)
+
+    def test_status_change_is_pushed(self):
+        proposal = ProjectProposal.objects.filter(status='PENDING').first()
+        proposal.status = 'APPROVED'
+        with mock.patch('accounts.push.LocalBroker.publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                proposal.save()
+        [[channel, event], _] = publish.call_args
+        self.assertEqual(channel, f'user:{self.freelancer.user_id}')
+        self.assertEqual(event['data']['status'], 'APPROVED')
+
+    def test_unread_notifications(self):
+        note = Notification.objects.create(user=self.user, title='Hi', message='-')
+        self.assertEqual(self.stats().unread_notifications, 1)
+        note.mark_as_read()
+        self.assertEqual(self.stats().unread_notifications, 0)
+
+    def test_bulk_mark_read(self):
+        for n in range(2):
+            Notification.objects.create(user=self.user, title=f'n{n}', message='-')
+        mark_notifications_read(self.user)
+        self.assertEqual(self.stats().unread_notifications, 0)
+        self.assertEqual(rebuild_startup_stats(), 0)
+
+    def test_rebuild_command_fixes_drift(self):
+        StartupStats.objects.filter(startup=self.profile).update(projects_planned=40, employees_count=-3)
+        out = StringIO()
+        call_command('rebuild_startup_stats', stdout=out)
+        self.assertIn('Reconciled 1', out.getvalue())
+        stats = self.stats()
+        self.assertEqual(stats.projects_planned, 2)
+        self.assertEqual(stats.employees_count, 1)
+
+    def test_missing_row_is_built_on_read(self):
+        StartupStats.objects.filter(startup=self.profile).delete()
+        self.assertEqual(get_dashboard_stats(self.profile)['proposals_count'], 4)
+
+
+class DashboardDataETagTests(StartupDataTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse('startup:dashboard_data')
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        # session + user + version stamp; no profile or stats reads
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        Project.objects.create(startup=self.profile, name='New', description='-', start_date=datetime.date.today())
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['projects']['planned'], 3)
+
+
+class TrendRollupTests(StartupDataTestCase):
+    def rollup(self):
+        call_command('rollup_startup_stats', stdout=StringIO())
+
+    def test_rollup_feeds_dashboard_trends(self):
+        self.rollup()
+        self.client.force_login(self.user)
+        trends = self.client.get(reverse('startup:dashboard_data')).json()['trends']
+        self.assertEqual(len(trends['weekly']), 12)
+        self.assertEqual(len(trends['monthly']), 12)
+        this_week = trends['weekly'][-1]
+        self.assertEqual(this_week['projects_created'], 4)
+        self.assertEqual(this_week['proposals_received'], 4)
+        self.assertEqual(this_week['funding_requested'], 2000)
+        self.assertEqual(this_week['sessions_completed'], 1)
+
+    def test_rerun_is_idempotent(self):
+        self.rollup()
+        rows = list(StartupDailyStats.objects.values_list('startup_id', 'day', 'projects_created'))
+        call_command('rollup_startup_stats', since=datetime.date.today().isoformat(), stdout=StringIO())
+        self.rollup()
+        self.assertEqual(list(StartupDailyStats.objects.values_list('startup_id', 'day', 'projects_created')), rows)
+
+    def test_rollup_moves_etag(self):
+        self.client.force_login(self.user)
+        url = reverse('startup:dashboard_data')
+        etag = self.client.get(url)['ETag']
+        self.rollup()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class OperatorAnalyticsTests(StartupDataTestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = CustomUser.objects.create_user(username='ops', password='pass12345', is_staff=True)
+        self.url = reverse('operator_analytics')
+
+    def test_staff_only(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_snapshot_from_rollups(self):
+        StartupProfile.objects.filter(pk=self.profile.pk).update(industry='Fintech')
+        call_command('rollup_startup_stats', stdout=StringIO())
+        data = OperatorSnapshot.objects.get().data
+        self.assertEqual(data['startups'], {'total': 1, 'active': 1})
+        self.assertEqual(data['funnel']['proposals'], 4)
+        self.assertEqual(data['funnel']['approval_rate'], round(1 / 3, 4))
+        self.assertEqual(data['mentors']['active'], 1)
+        self.assertEqual(data['mentors']['sessions_booked'], 3)
+        self.assertEqual(data['mentors']['sessions_completed'], 1)
+        [industry] = data['funding_by_industry']
+        self.assertEqual(industry['industry'], 'Fintech')
+        self.assertEqual(industry['rounds'], 2)
+        self.assertEqual(float(industry['amount_requested']), 2000)
+        self.assertEqual(float(industry['amount_approved']), 1000)
+
+    def test_view_reads_snapshot_only(self):
+        call_command('rollup_startup_stats', stdout=StringIO())
+        self.client.force_login(self.staff)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Proposal funnel')
+        tables = ('projects_', 'funding_', 'mentors_', 'startup_startupstats', 'startup_startupdailystats')
+        self.assertFalse([q['sql'] for q in queries if any(t in q['sql'] for t in tables)])
+
+
+class CreateProjectBroadcastTests(StartupDataTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def create_project(self):
+        return self.client.post(reverse('startup:create_project'), {
+            'name': 'Open call', 'description': '-', 'start_date': datetime.date.today().isoformat(),
+            'status': 'PLANNED', 'assigned_to_freelancers': 'on',
+        })
+
+    def test_one_broadcast_reaches_every_freelancer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.create_project()
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Broadcast.objects.filter(role='FREELANCER').count(), 1)
+        self.assertFalse(Notification.objects.filter(user=self.freelancer.user).exists())
+
+        summary = get_notification_summary(self.freelancer.user)
+        self.assertEqual(summary['count'], 1)
+        self.assertEqual(summary['recent'][0].title, 'New Project Opportunity: Open call')
+
+    def test_request_cost_does_not_grow_with_freelancers(self):
+        def request_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.create_project()
+            return len(queries)
 
-# Create your tests here.
+        baseline = request_queries()
+        for n in range(5):
+            user = CustomUser.objects.create_user(username=f'extra{n}', password='pass12345', role='FREELANCER')
+            FreelancerProfile.objects.create(user=user, full_name=f'Extra {n}')
+        self.assertEqual(request_queries(), baseline)
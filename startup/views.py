@@ -1,8 +1,14 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.conf import settings
+from django.db import transaction
 from django.contrib import messages
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
 from .forms import (
     StartupSignupForm,
@@ -12,21 +18,18 @@ from .forms import (
     FundingForm,
     MentorshipSessionForm
 )
-from accounts.supabase_helper import upload_to_supabase
-from accounts.models import Notification
+from accounts.uploads import save_deferred
+from accounts.fragments import bump_widgets
+from accounts.outbox import publish_event
+from accounts.models import Broadcast, Notification
+from accounts.notifications import inbox_context
 from projects.models import Project, ProjectProposal, ProjectAssignment
-from funding.models import FundingRound
 from .models import Employee
 from mentors.models import MentorshipSession
-from freelancer.models import FreelancerProfile
-from supabase import create_client
 from .helpers import *
-# -----------------------------
-# Helper Functions
-# -----------------------------
-def get_supabase_client():
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-
+from .stats import get_dashboard_stats, get_stats_version, dashboard_payload, rebuild_startup_stats
+from .rollups import get_trend_series
+from .analytics import get_operator_analytics
 # -----------------------------
 # 1️⃣ Startup Signup & Profile
 # -----------------------------
@@ -42,15 +45,8 @@ def startup_signup(request):
             # Create profile
             profile = profile_form.save(commit=False)
             profile.user = user
-            logo_file = request.FILES.get('logo')
-            if logo_file:
-                try:
-                    logo_url = upload_to_supabase(logo_file, folder='startups')
-                    if logo_url:
-                        profile.logo = logo_url
-                except Exception as e:
-                    print(f"⚠️ Error uploading logo to Supabase: {e}")
-            profile.save()
+            # The logo is staged locally here and moved to storage after the response
+            save_deferred(profile, 'logo')
             login(request, user)
             return redirect('startup:startup_dashboard')
         else:
@@ -73,18 +69,7 @@ def profile_edit(request):
         form = StartupProfileForm(request.POST, request.FILES, instance=profile)
         if form.is_valid():
             profile = form.save(commit=False)
-
-            # Optional: upload logo to Supabase (same logic as signup)
-            logo_file = request.FILES.get('logo')
-            if logo_file:
-                try:
-                    logo_url = upload_to_supabase(logo_file, folder='startups')
-                    if logo_url:
-                        profile.logo = logo_url
-                except Exception as e:
-                    print("Logo upload failed:", e)
-
-            profile.save()
+            save_deferred(profile, 'logo')
             messages.success(request, "✅ Profile updated successfully")
             return redirect('startup:stprofile_detail')
     else:
@@ -102,65 +87,43 @@ def profile_edit(request):
 @login_required
 def startup_dashboard(request):
     profile = request.user.startup_profile
-    projects = Project.objects.filter(startup=profile)
-    proposals = ProjectProposal.objects.filter(project__startup=profile)
-    funding_qs = FundingRound.objects.filter(startup=profile)
-    mentorship_qs = MentorshipSession.objects.filter(startup=profile)
 
     context = {
         'profile': profile,
-        'projects_count': projects.count(),
-        'projects_open': projects.filter(status='PLANNED').count(),
-        'projects_in_progress': projects.filter(status='ONGOING').count(),
-        'projects_completed': projects.filter(status='COMPLETED').count(),
-        'employees_count': profile.employees.count(),
-        'proposals_count': proposals.count(),
-        'proposals_approved': proposals.filter(status='APPROVED').count(),
-        'proposals_rejected': proposals.filter(status='REJECTED').count(),
-        'funding_count': funding_qs.count(),
-        'funding_approved': funding_qs.filter(status='APPROVED').count(),
-        'funding_rejected': funding_qs.filter(status='REJECTED').count(),
-        'mentorship_count': mentorship_qs.filter(status='SCHEDULED').count(),
-        'mentorship_completed': mentorship_qs.filter(status='COMPLETED').count(),
-        'notifications_count': request.user.notifications.filter(read=False).count(),
-        'notifications': request.user.notifications.all().order_by('-created_at')[:5],
+        # Only read when a {% cache %} fragment is rendered, so a cache hit skips the stats row
+        'stats': SimpleLazyObject(lambda: get_dashboard_stats(profile)),
     }
     return render(request, 'dashboard.html', context)
 
 
 
+def dashboard_etag(request):
+    stamp = get_stats_version(request.user)
+    # The date is part of the tag because the trend windows move every day
+    return "%d-%d-%s" % (*stamp, timezone.localdate().isoformat()) if stamp else None
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=dashboard_etag)
 def dashboard_data(request):
     profile = request.user.startup_profile
-    projects = Project.objects.filter(startup=profile)
-    proposals = ProjectProposal.objects.filter(project__startup=profile)
-    funding_qs = FundingRound.objects.filter(startup=profile)
-    mentorship_qs = MentorshipSession.objects.filter(startup=profile)
-
-    data = {
-        'projects': {
-            'planned': projects.filter(status='PLANNED').count(),
-            'ongoing': projects.filter(status='ONGOING').count(),
-            'completed': projects.filter(status='COMPLETED').count(),
-        },
-        'proposals': {
-            'submitted': proposals.count(),
-            'approved': proposals.filter(status='APPROVED').count(),
-            'rejected': proposals.filter(status='REJECTED').count(),
-        },
-        'funding': {
-            'requested': funding_qs.count(),
-            'approved': funding_qs.filter(status='APPROVED').count(),
-            'rejected': funding_qs.filter(status='REJECTED').count(),
-        },
-        'mentorship': {
-            'scheduled': mentorship_qs.filter(status='SCHEDULED').count(),
-            'completed': mentorship_qs.filter(status='COMPLETED').count(),
-        }
-    }
+    data = dashboard_payload(get_dashboard_stats(profile))
+    data['trends'] = get_trend_series(profile)
 
     return JsonResponse(data)
 
+
+@staff_member_required
+def operator_analytics(request):
+    # Served from the stored snapshot only; rollup_startup_stats refreshes it
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Platform analytics',
+        'snapshot': get_operator_analytics(),
+    }
+    return render(request, 'operator_analytics.html', context)
+
 # -----------------------------
 # 3️⃣ Project CRUD
 # -----------------------------
@@ -174,8 +137,6 @@ def startup_projects(request):
         'projects_count': projects.count(),
         'projects_in_progress': projects.filter(status='IN_PROGRESS').count(),
         'projects_completed': projects.filter(status='COMPLETED').count(),
-        'notifications_count': request.user.notifications.filter(read=False).count(),
-        'notifications': request.user.notifications.all().order_by('-created_at')[:5],
     }
     return render(request, 'projects_list.html', context)
 
@@ -203,13 +164,11 @@ def create_project(request):
 
             # Notify freelancers if project is open
             if project.assigned_to_freelancers:
-                freelancers = FreelancerProfile.objects.all()
-                for f in freelancers:
-                    Notification.objects.create(
-                        user=f.user,
-                        title=f"New Project Opportunity: {project.name}",
-                        message=f"A new project '{project.name}' is open for proposals."
-                    )
+                Broadcast.objects.create(
+                    role='FREELANCER',
+                    title=f"New Project Opportunity: {project.name}",
+                    message=f"A new project '{project.name}' is open for proposals."
+                )
 
             messages.success(request, "✅ Project created successfully!")
             return redirect('startup:startup_projects')
@@ -294,6 +253,7 @@ def startup_employees(request):
 from django.http import JsonResponse
 
 @login_required
+@transaction.atomic
 def approve_proposal(request, proposal_id):
     if request.method == 'POST' and request.headers.get('x-requested-with') == 'XMLHttpRequest':
         proposal = get_object_or_404(ProjectProposal, id=proposal_id)
@@ -311,7 +271,11 @@ def approve_proposal(request, proposal_id):
         proposal.save()
 
         # Reject other proposals automatically
-        ProjectProposal.objects.filter(project=project).exclude(id=proposal.id).update(status='REJECTED')
+        others = ProjectProposal.objects.filter(project=project).exclude(id=proposal.id)
+        bump_widgets(['stats'], others.values_list('freelancer__user_id', flat=True))
+        others.update(status='REJECTED')
+        # Bulk update skips the stats signals, so recount this startup
+        rebuild_startup_stats([project.startup_id])
 
         # Create assignment
         ProjectAssignment.objects.create(
@@ -324,8 +288,8 @@ def approve_proposal(request, proposal_id):
         project.save()
 
         # Notify freelancer
-        Notification.objects.create(
-            user=proposal.freelancer.user,
+        publish_event(
+            proposal.freelancer.user_id,
             title="Project Proposal Approved",
             message=f"Your proposal for project '{project.name}' has been approved."
         )
@@ -337,6 +301,7 @@ def approve_proposal(request, proposal_id):
 
 
 @login_required
+@transaction.atomic
 def reject_proposal(request, proposal_id):
     if request.method == 'POST' and request.headers.get('x-requested-with') == 'XMLHttpRequest':
         proposal = get_object_or_404(ProjectProposal, id=proposal_id)
@@ -347,8 +312,8 @@ def reject_proposal(request, proposal_id):
             proposal.rejection_note = rejection_note
             proposal.save()
 
-            Notification.objects.create(
-                user=proposal.freelancer.user,
+            publish_event(
+                proposal.freelancer.user_id,
                 title="Project Proposal Rejected",
                 message=f"Your proposal for project '{proposal.project.name}' was rejected. Reason: {rejection_note}"
             )
@@ -417,22 +382,18 @@ def delete_employee(request, employee_id):
 # -----------------------------
 @login_required
 def notifications_list(request):
-    notifications = request.user.notifications.all().order_by('-created_at')
-    return render(request, 'notifications.html', {'notifications': notifications})
+    return render(request, 'notifications.html', inbox_context(request))
 
 @login_required
 def mark_notification_read(request, notification_id):
     notification = get_object_or_404(Notification, id=notification_id, user=request.user)
-    notification.read = True
-    notification.save()
+    notification.mark_as_read()
     return redirect('startup:notifications_list')
 
 @login_required
 def notification_detail(request, notification_id):
     notification = get_object_or_404(Notification, id=notification_id, user=request.user)
-    if not notification.read:
-        notification.read = True
-        notification.save()
+    notification.mark_as_read()
     return render(request, 'startup/notification_detail.html', {'notification': notification})
 
 # # -----------------------------
@@ -602,6 +563,7 @@ def startup_sessions(request):
 # Create a new session request
 # -----------------------------
 @login_required
+@transaction.atomic
 def create_session(request):
     if request.method == 'POST':
         form = MentorshipSessionForm(request.POST)
@@ -613,14 +575,14 @@ def create_session(request):
             session.save()
 
             # Notify mentor
-            Notification.objects.create(
-                user=session.mentor.user,
+            publish_event(
+                session.mentor.user_id,
                 title="New Mentorship Session Request",
                 message=f"{session.startup.startup_name} requested a session on '{session.topic}' for {session.session_date.strftime('%d %b %Y, %I:%M %p')}."
             )
 
-            Notification.objects.create(
-                user=request.user,
+            publish_event(
+                request.user,
                 title="Session Request Sent",
                 message=f"Your request to {session.mentor.user.username} is awaiting approval."
             )
@@ -645,6 +607,7 @@ def session_detail(request, session_id):
 # Update session (notes or status)
 # -----------------------------
 @login_required
+@transaction.atomic
 def update_session(request, session_id):
     session = get_object_or_404(MentorshipSession, id=session_id, startup=request.user.startup_profile)
 
@@ -662,23 +625,29 @@ def update_session(request, session_id):
                 updated_session.approval_status = 'PENDING'
 
                 # Notify mentor for re-approval
-                Notification.objects.create(
-                    user=updated_session.mentor.user,
+                publish_event(
+                    updated_session.mentor.user_id,
                     title="Session Updated – Approval Required",
-                    message=f"{updated_session.startup.startup_name} updated session '{updated_session.topic}'. Please review and approve again."
+                    message=f"{updated_session.startup.startup_name} updated session '{updated_session.topic}'. Please review and approve again.",
+                    kind='session.updated',
+                    key=f'session:{session.id}',
                 )
 
-                Notification.objects.create(
-                    user=request.user,
+                publish_event(
+                    request.user,
                     title="Session Update Sent",
-                    message=f"Your updated session request for '{updated_session.topic}' is awaiting mentor approval again."
+                    message=f"Your updated session request for '{updated_session.topic}' is awaiting mentor approval again.",
+                    kind='session.update_sent',
+                    key=f'session:{session.id}',
                 )
             else:
                 # Normal update for pending/rejected
-                Notification.objects.create(
-                    user=updated_session.mentor.user,
+                publish_event(
+                    updated_session.mentor.user_id,
                     title="Session Request Updated",
-                    message=f"{updated_session.startup.startup_name} modified the mentorship session request for '{updated_session.topic}'."
+                    message=f"{updated_session.startup.startup_name} modified the mentorship session request for '{updated_session.topic}'.",
+                    kind='session.updated',
+                    key=f'session:{session.id}',
                 )
 
             updated_session.save()
@@ -705,6 +674,7 @@ def update_session(request, session_id):
 # Cancel a session
 # -----------------------------
 @login_required
+@transaction.atomic
 def cancel_session(request, session_id):
     session = get_object_or_404(MentorshipSession, id=session_id, startup=request.user.startup_profile)
 
@@ -712,8 +682,8 @@ def cancel_session(request, session_id):
         session.status = 'CANCELLED'
         session.save()
 
-        Notification.objects.create(
-            user=session.mentor.user,
+        publish_event(
+            session.mentor.user_id,
             title="Session Cancelled",
             message=f"{session.startup.startup_name} cancelled the mentorship session '{session.topic}'."
         )
@@ -728,12 +698,12 @@ def cancel_session(request, session_id):
 # 7️⃣ Notifications for startup
 @login_required
 def startup_notifications(request):
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
-    return render(request, 'notifications.html', {'notifications': notifications})
+    return render(request, 'notifications.html', inbox_context(request))
 # -----------------------------
 # 9️⃣ Assign Employees to Projects
 # -----------------------------
 @login_required
+@transaction.atomic
 def assign_employee_to_project(request, project_id):
     project = get_object_or_404(Project, id=project_id, startup=request.user.startup_profile)
     if request.method == 'POST':
@@ -743,10 +713,12 @@ def assign_employee_to_project(request, project_id):
         # Notify freelancers
         freelancers = project.employees_assigned.filter(role='FREELANCER')
         for freelancer in freelancers:
-            Notification.objects.create(
-                user=freelancer.user,
+            publish_event(
+                freelancer.user,
                 title="Project Assigned",
-                message=f"You have been assigned to project: {project.name}"
+                message=f"You have been assigned to project: {project.name}",
+                kind='project.assigned',
+                key=f'project:{project.id}',
             )
         return redirect('startup:startup_projects')
     employees = request.user.startup_profile.employees.all()